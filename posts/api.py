@@ -0,0 +1,142 @@
+import json
+
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from .models import Comment, Group, Post, TimelineEntry, User
+from .pagination import POSTS_PER_PAGE, CursorPaginator
+
+MAX_PAGE_SIZE = 500
+
+# Output name -> lookup of every post field the API shows.
+POST_FIELDS = {
+    "id": "id",
+    "text": "text",
+    "pub_date": "pub_date",
+    "updated": "updated",
+    "author": "author__username",
+    "group": "group__slug",
+    "image": "image",
+    "image_width": "image_width",
+    "image_height": "image_height",
+    "comments_count": "comments_count",
+}
+
+COMMENT_FIELDS = {
+    "id": "id",
+    "post": "post_id",
+    "author": "author__username",
+    "text": "text",
+    "created": "created",
+}
+
+
+def _dumps(data):
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def _post_rows(queryset, prefix="", extra=()):
+    lookups = [prefix + lookup for lookup in POST_FIELDS.values()]
+    return queryset.values(*lookups, *extra)
+
+
+def _post_json(row, prefix=""):
+    data = {name: row[prefix + lookup] for name, lookup in POST_FIELDS.items()}
+    data["image"] = default_storage.url(data["image"]) if data["image"] else None
+    return data
+
+
+def _comment_json(row):
+    return {name: row[lookup] for name, lookup in COMMENT_FIELDS.items()}
+
+
+def _page_size(request):
+    try:
+        size = int(request.GET.get("limit", POSTS_PER_PAGE))
+    except ValueError:
+        size = POSTS_PER_PAGE
+    return min(max(size, 1), MAX_PAGE_SIZE)
+
+
+def _error(status, detail):
+    return JsonResponse({"detail": detail}, status=status)
+
+
+def _stream(request, rows, serialize, keys=("pub_date", "id")):
+    """Stream a page of ``.values()`` rows as they come from the database.
+
+    Lists are keyset-paginated newest first: the ``next_cursor`` of a
+    response, passed back as ``?after=``, returns the following page.
+    """
+    paginator = CursorPaginator(rows, _page_size(request), keys=keys)
+    page = paginator.seek(request.GET.get("after"))[: paginator.per_page + 1]
+
+    def chunks():
+        yield '{"results": ['
+        last, has_next = None, False
+        for index, row in enumerate(page.iterator()):
+            if index == paginator.per_page:
+                has_next = True
+                break
+            yield ("," if index else "") + _dumps(serialize(row))
+            last = row
+        cursor = paginator.encode_cursor(last) if has_next else None
+        yield '], "next_cursor": ' + _dumps(cursor) + "}"
+
+    return StreamingHttpResponse(chunks(), content_type="application/json")
+
+
+@require_GET
+def index(request):
+    return _stream(request, _post_rows(Post.objects.all()), _post_json)
+
+
+@require_GET
+def group_posts(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list("pk", flat=True).first()
+    if group_id is None:
+        return _error(404, "Group not found.")
+    posts = _post_rows(Post.objects.filter(group_id=group_id))
+    return _stream(request, posts, _post_json)
+
+
+@require_GET
+def profile(request, username):
+    users = User.objects.filter(username=username)
+    user_id = users.values_list("pk", flat=True).first()
+    if user_id is None:
+        return _error(404, "User not found.")
+    posts = _post_rows(Post.objects.filter(author_id=user_id))
+    return _stream(request, posts, _post_json)
+
+
+@require_GET
+def follow_index(request):
+    if not request.user.is_authenticated:
+        return _error(401, "Authentication required.")
+    entries = TimelineEntry.objects.filter(user=request.user)
+    rows = _post_rows(entries, prefix="post__", extra=("pub_date", "post_id"))
+    return _stream(
+        request,
+        rows,
+        lambda row: _post_json(row, prefix="post__"),
+        keys=("pub_date", "post_id"),
+    )
+
+
+@require_GET
+def post(request, post_id):
+    row = _post_rows(Post.objects.filter(pk=post_id)).first()
+    if row is None:
+        return _error(404, "Post not found.")
+    return JsonResponse(_post_json(row), json_dumps_params={"ensure_ascii": False})
+
+
+@require_GET
+def comments(request, post_id):
+    if not Post.objects.filter(pk=post_id).exists():
+        return _error(404, "Post not found.")
+    rows = Comment.objects.filter(post_id=post_id).values(*COMMENT_FIELDS.values())
+    return _stream(request, rows, _comment_json, keys=("created", "id"))
@@ -0,0 +1,11 @@
+from django.urls import path
+from . import api
+
+urlpatterns = [
+    path("posts/", api.index, name="api_index"),
+    path("posts/<int:post_id>/", api.post, name="api_post"),
+    path("posts/<int:post_id>/comments/", api.comments, name="api_comments"),
+    path("groups/<slug:slug>/posts/", api.group_posts, name="api_group"),
+    path("users/<str:username>/posts/", api.profile, name="api_profile"),
+    path("follow/", api.follow_index, name="api_follow"),
+]
@@ -1,5 +1,21 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def install_search(sender, using, **kwargs):
+    from . import search
+
+    search.install(connections[using])
 
 
 class PostsConfig(AppConfig):
     name = "posts"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from . import sqlite
+
+        post_migrate.connect(install_search, sender=self)
+        connection_created.connect(sqlite.configure)
@@ -0,0 +1,379 @@
+import math
+import os
+import random
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.template.backends.django import DjangoTemplates
+
+from . import metrics
+
+_MISSING = object()
+_cache_state = threading.local()
+
+
+class TimedTemplate:
+    """Wraps a backend template to add its render time to the request."""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        timings = metrics.current()
+        if timings is None or timings.template_depth:
+            # Nested renders are already inside the outer measurement.
+            return self.template.render(context, request)
+        timings.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            timings.template_time += time.perf_counter() - started
+            timings.template_depth -= 1
+
+
+class InstrumentedTemplates(DjangoTemplates):
+    """``DjangoTemplates`` that reports render time to ``posts.metrics``."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+class CacheMetricsMixin:
+    """Counts cache hits and misses of the current request."""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        if not getattr(_cache_state, "in_get_many", False):
+            if value is _MISSING:
+                metrics.record_cache(hits=0, misses=1)
+            else:
+                metrics.record_cache(hits=1)
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        # Backends without a native get_many fall back to get() per key.
+        _cache_state.in_get_many = True
+        try:
+            found = super().get_many(keys, version=version)
+        finally:
+            _cache_state.in_get_many = False
+        metrics.record_cache(hits=len(found), misses=len(keys) - len(found))
+        return found
+
+
+class InstrumentedLocMemCache(CacheMetricsMixin, LocMemCache):
+    pass
+
+
+class TieredCache(BaseCache):
+    """A bounded in-process LRU in front of a cache shared by all workers.
+
+    Options:
+
+    * ``SHARED``: alias of the shared cache (e.g. a ``FileBasedCache``
+      or memcached) every worker reads and writes through.
+    * ``LOCAL_TIMEOUT`` / ``LOCAL_MAX_ENTRIES``: lifetime and size of the
+      in-process copies. The lifetime bounds how long a worker can serve
+      a value another worker has already replaced.
+    * ``SHARED_ONLY``: key prefixes that skip the local tier, for values
+      that must be the same in every worker, like generation tokens.
+    * ``STALE_TIMEOUT``: how long an expired value is still kept around to
+      be served while one caller recomputes it.
+    * ``LOCK_TIMEOUT`` / ``WAIT_TIMEOUT``: lifetime of a recomputation
+      lock, and how long ``get_or_set`` waits for another worker's result.
+
+    Values are stored with their expiry time and how long they took to
+    compute. Reads refresh a value early with a probability that grows as
+    its expiry nears ("XFetch"), and only the caller that wins the
+    recomputation lock sees a miss; everyone else keeps getting the
+    current value, so an expiring key costs one recomputation instead of
+    one per worker.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.shared_alias = options.get("SHARED", "shared")
+        self.shared_only = tuple(options.get("SHARED_ONLY", ()))
+        self.local_timeout = options.get("LOCAL_TIMEOUT", 5)
+        self.stale_timeout = options.get("STALE_TIMEOUT", 30)
+        self.lock_timeout = options.get("LOCK_TIMEOUT", 10)
+        self.wait_timeout = options.get("WAIT_TIMEOUT", 2)
+        self.beta = options.get("BETA", 1.0)
+        self.local = LocMemCache(
+            f"tiered:{location}",
+            {
+                "TIMEOUT": self.local_timeout,
+                "OPTIONS": {"MAX_ENTRIES": options.get("LOCAL_MAX_ENTRIES", 1000)},
+            },
+        )
+        # Keys this instance holds the recomputation lock of -> when the
+        # recomputation started. Cache instances are per thread.
+        self.claimed = {}
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def _local_ok(self, key):
+        return not key.startswith(self.shared_only)
+
+    def _timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _fetch(self, key, version):
+        entry = None
+        if self._local_ok(key):
+            entry = self.local.get(key, version=version)
+        if entry is None:
+            entry = self.shared.get(key, version=version)
+            if entry is not None:
+                self._keep_local(key, entry, version)
+        return entry
+
+    def _keep_local(self, key, entry, version):
+        if not self._local_ok(key):
+            return
+        value, expires, delta = entry
+        timeout = self.local_timeout
+        if expires is not None:
+            timeout = min(timeout, expires - time.time())
+        if timeout > 0:
+            self.local.set(key, entry, timeout, version=version)
+
+    def _stale(self, entry):
+        """Whether a value should be recomputed now (XFetch)."""
+        value, expires, delta = entry
+        if expires is None:
+            return False
+        # -log(random()) is exponentially distributed: the closer to
+        # expiry and the slower the value is to compute, the likelier.
+        early = delta * self.beta * -math.log(1.0 - random.random())
+        return time.time() + early >= expires
+
+    def _lock_key(self, key):
+        return f"{key}:lock"
+
+    def _lock_path(self, key, version):
+        # FileBasedCache.add() is a has_key() followed by a set(), so two
+        # workers can both win it. Its locks are files created with O_EXCL
+        # next to the entries instead; other backends' add() is atomic.
+        to_file = getattr(self.shared, "_key_to_file", None)
+        if to_file is None:
+            return None
+        return to_file(self._lock_key(key), version) + ".lock"
+
+    def _lock(self, key, version):
+        path = self._lock_path(key, version)
+        if path is None:
+            return self.shared.add(
+                self._lock_key(key), 1, self.lock_timeout, version=version
+            )
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        for _ in range(2):
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                try:
+                    age = time.time() - os.path.getmtime(path)
+                except FileNotFoundError:
+                    continue
+                if age < self.lock_timeout:
+                    return False
+                # Left behind by a worker that died while recomputing.
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        return False
+
+    def _locked(self, key, version):
+        path = self._lock_path(key, version)
+        if path is None:
+            return self.shared.has_key(self._lock_key(key), version=version)
+        try:
+            return time.time() - os.path.getmtime(path) < self.lock_timeout
+        except FileNotFoundError:
+            return False
+
+    def _unlock(self, key, version):
+        path = self._lock_path(key, version)
+        if path is None:
+            self.shared.delete(self._lock_key(key), version=version)
+            return
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _claim(self, key, version):
+        if self._lock(key, version):
+            if len(self.claimed) > 1000:
+                self.claimed.clear()
+            self.claimed[key] = time.monotonic()
+            return True
+        return False
+
+    def _release(self, key, version):
+        if self.claimed.pop(key, None) is not None:
+            self._unlock(key, version)
+
+    def _entry(self, key, value, timeout):
+        started = self.claimed.get(key)
+        delta = time.monotonic() - started if started is not None else 0.0
+        expires = None if timeout is None else time.time() + timeout
+        return value, expires, delta
+
+    def _shared_timeout(self, timeout):
+        return None if timeout is None else timeout + self.stale_timeout
+
+    def _current(self, key, entry, version):
+        """Whether to hand out ``entry`` rather than a miss.
+
+        A miss goes to the one caller that wins the recomputation lock of
+        a stale entry; its set() releases the lock.
+        """
+        return entry is not None and not (
+            self._stale(entry) and self._claim(key, version)
+        )
+
+    # Hits and misses are recorded here rather than by CacheMetricsMixin,
+    # whose get() would count a stale value handed out as a miss as a hit.
+    def get(self, key, default=None, version=None):
+        entry = self._fetch(key, version)
+        if not self._current(key, entry, version):
+            metrics.record_cache(hits=0, misses=1)
+            return default
+        metrics.record_cache(hits=1)
+        return entry[0]
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = {}
+        for key in keys:
+            if self._local_ok(key):
+                entry = self.local.get(key, version=version)
+                if entry is not None:
+                    found[key] = entry
+        missing = [key for key in keys if key not in found]
+        if missing:
+            shared = self.shared.get_many(missing, version=version)
+            for key, entry in shared.items():
+                self._keep_local(key, entry, version)
+            found.update(shared)
+        values = {
+            key: entry[0]
+            for key, entry in found.items()
+            if self._current(key, entry, version)
+        }
+        metrics.record_cache(hits=len(values), misses=len(keys) - len(values))
+        return values
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        """Single-flight ``get_or_set``.
+
+        On a miss only one caller across all workers runs ``default``; the
+        others wait up to ``WAIT_TIMEOUT`` for its result and compute the
+        value themselves only if it does not arrive. A ``default`` that
+        returns None stores nothing.
+        """
+        entry = self._fetch(key, version)
+        if entry is not None:
+            metrics.record_cache(hits=1)
+            if self._stale(entry) and self._claim(key, version):
+                return self._compute(key, default, timeout, version)
+            return entry[0]
+        metrics.record_cache(hits=0, misses=1)
+
+        if self._claim(key, version):
+            # Another worker may have stored the value and let go of the
+            # lock between our miss and our claim.
+            entry = self.shared.get(key, version=version)
+            if entry is not None:
+                self._release(key, version)
+                self._keep_local(key, entry, version)
+                return entry[0]
+            return self._compute(key, default, timeout, version)
+
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(0.01)
+            locked = self._locked(key, version)
+            entry = self.shared.get(key, version=version)
+            if entry is not None:
+                self._keep_local(key, entry, version)
+                return entry[0]
+            if not locked:
+                # The winner stored nothing; do not wait any longer.
+                break
+        return self._compute(key, default, timeout, version)
+
+    def _compute(self, key, default, timeout, version):
+        try:
+            value = default() if callable(default) else default
+            if value is not None:
+                self.set(key, value, timeout, version=version)
+            return value
+        finally:
+            self._release(key, version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        entry = self._entry(key, value, timeout)
+        self.shared.set(key, entry, self._shared_timeout(timeout), version=version)
+        self._keep_local(key, entry, version)
+        self._release(key, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        entries = {key: self._entry(key, value, timeout) for key, value in data.items()}
+        failed = self.shared.set_many(
+            entries, self._shared_timeout(timeout), version=version
+        )
+        for key, entry in entries.items():
+            self._keep_local(key, entry, version)
+            self._release(key, version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        entry = self._entry(key, value, timeout)
+        return self.shared.add(
+            key, entry, self._shared_timeout(timeout), version=version
+        )
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        entry = self.shared.get(key, version=version)
+        if entry is None:
+            return False
+        self.set(key, entry[0], timeout, version=version)
+        return True
+
+    def has_key(self, key, version=None):
+        return self._fetch(key, version) is not None
+
+    def delete(self, key, version=None):
+        self.local.delete(key, version=version)
+        self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            self.local.delete(key, version=version)
+        self.shared.delete_many(keys, version=version)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
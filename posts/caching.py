@@ -0,0 +1,154 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from . import replicas
+from .models import Follow, Group
+
+
+def feed_cache_timeout():
+    """Lifetime of data cached from this thread's reads.
+
+    A write bumps its scopes at once, but a replica serves the old rows
+    for up to ``replicas.lag()``: whatever is cached from a replica must
+    not outlive that, or it would stay stale under the new generation.
+    """
+    timeout = getattr(settings, "POSTS_FEED_CACHE_TIMEOUT", 60 * 60)
+    if replicas.reading():
+        timeout = min(timeout, replicas.lag())
+    return timeout
+
+
+def page_cache_timeout():
+    # Logged-out readers are never pinned, so with replicas configured
+    # every cached page was rendered from one.
+    timeout = getattr(settings, "POSTS_PAGE_CACHE_TIMEOUT", 60 * 60)
+    if replicas.replica_aliases():
+        timeout = min(timeout, replicas.lag())
+    return timeout
+
+
+def scope(kind, owner=""):
+    """Name of an invalidation scope, e.g. ``group:cats`` or ``post:42``."""
+    return f"{kind}:{owner}"
+
+
+def _generation_key(name):
+    return f"posts:generation:{name}"
+
+
+def generations(*scopes):
+    """Current generation tokens of the given scopes.
+
+    A scope that has no token yet (or whose token was evicted) gets a fresh
+    one, which orphans every fragment cached under the old token.
+    """
+    keys = {_generation_key(name): name for name in scopes}
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return [str(found[_generation_key(name)]) for name in scopes]
+
+
+def bump(*scopes):
+    """Invalidate everything cached under the given scopes.
+
+    Inside a transaction the scopes are bumped again on commit, so a
+    fragment rendered from pre-commit data in the meantime is orphaned too.
+    """
+    names = set(scopes)
+
+    def write():
+        token = time.time_ns()
+        cache.set_many({_generation_key(name): token for name in names}, timeout=None)
+
+    write()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(write)
+
+
+def feed_key(request, kind, owner=""):
+    """Vary-on value for a cached feed fragment.
+
+    Combines the feed, its owner, the requested page or cursor, the feed's
+    generation and the viewer, because cards show the viewer's own edit
+    buttons.
+    """
+    name = scope(kind, owner)
+    position = ",".join(
+        f"{param}={request.GET.get(param, '')}" for param in ("page", "after", "before")
+    )
+    (generation,) = generations(name)
+    viewer = request.user.pk if request.user.is_authenticated else "anon"
+    return f"{name}|{position}|{generation}|{viewer}"
+
+
+def feed_context(request, kind, owner=""):
+    """Template context for a ``{% cache %}``-wrapped feed."""
+    return {
+        "feed_cache_key": feed_key(request, kind, owner),
+        "feed_cache_timeout": feed_cache_timeout(),
+    }
+
+
+# Scopes whose writes change a page, by URL name, from the URL's kwargs
+# alone so that they can be known without touching the database.
+PAGE_SCOPES = {
+    "index": lambda kwargs: [scope("index")],
+    "group": lambda kwargs: [scope("group", kwargs["slug"])],
+    "profile": lambda kwargs: [scope("author", kwargs["username"])],
+    "post": lambda kwargs: [
+        scope("post", kwargs["post_id"]),
+        scope("author", kwargs["username"]),
+    ],
+    "post_comments": lambda kwargs: [scope("post", kwargs["post_id"])],
+    "trending": lambda kwargs: [scope("trending")],
+    "groups": lambda kwargs: [scope("groups")],
+}
+
+
+def page_scopes(url_name, kwargs):
+    return PAGE_SCOPES[url_name](kwargs)
+
+
+def post_scopes(post, old_group_id=None):
+    scopes = [
+        scope("index"),
+        scope("trending"),
+        scope("author", post.author.username),
+        scope("post", post.pk),
+    ]
+    if post.group_id is not None:
+        scopes.append(scope("group", post.group.slug))
+    if old_group_id is not None:
+        old_slug = Group.objects.filter(pk=old_group_id).values_list("slug", flat=True)
+        scopes.extend(scope("group", slug) for slug in old_slug)
+    follower_ids = Follow.objects.filter(author_id=post.author_id).values_list(
+        "user_id", flat=True
+    )
+    scopes.extend(scope("follow", user_id) for user_id in follower_ids)
+    return scopes
+
+
+def invalidate_post(post, old_group_id=None):
+    bump(*post_scopes(post, old_group_id))
+
+
+def invalidate_follow(follow):
+    invalidate_follows(follow.user, [follow.author])
+
+
+def invalidate_follows(user, authors):
+    bump(
+        scope("follow", user.pk),
+        scope("author", user.username),
+        *(scope("author", author.username) for author in authors),
+    )
+
+
+def invalidate_group(group):
+    bump(scope("index"), scope("group", group.slug), scope("groups"))
@@ -0,0 +1,102 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.template.loader import get_template, render_to_string
+from django.test import RequestFactory
+from django.utils.safestring import mark_safe
+
+CARD_TEMPLATE = "includes/post_card.html"
+EDIT_TEMPLATE = "includes/post_edit_button.html"
+
+# Where the card template leaves room for the viewer-dependent edit button.
+EDIT_SLOT = "<!--post-card-edit-->"
+
+ITEM_TEMPLATE = "includes/post_item.html"
+# post_item.html from before the card cache, the baseline of benchmark().
+BASELINE_TEMPLATE = "includes/post_item_uncached.html"
+
+
+def card_cache_timeout():
+    return getattr(settings, "POSTS_CARD_CACHE_TIMEOUT", 24 * 60 * 60)
+
+
+def card_key(post):
+    """Cache key of a post's card, changing with anything the card shows.
+
+    ``Post.updated`` moves on edits, new comments and thumbnails; the
+    author's and group's names are part of the key since renaming them
+    does not touch the post.
+    """
+    group = post.group
+    shown = [
+        post.updated.isoformat(),
+        post.author.username,
+        group.slug if group else "",
+        group.title if group else "",
+    ]
+    digest = hashlib.md5("|".join(shown).encode()).hexdigest()
+    return f"posts:card:{post.pk}:{digest}"
+
+
+def _parts(post):
+    key = card_key(post)
+    parts = cache.get(key)
+    if parts is None:
+        html = render_to_string(CARD_TEMPLATE, {"post": post})
+        head, _, tail = html.partition(EDIT_SLOT)
+        parts = (head, tail)
+        cache.set(key, parts, card_cache_timeout())
+    return parts
+
+
+def card_html(post, user=None):
+    """The card of a post as ``user`` sees it.
+
+    The card itself is the same for every reader and cached; only the
+    edit button is rendered per viewer.
+    """
+    head, tail = _parts(post)
+    edit = ""
+    if user is not None and user.is_authenticated and user.pk == post.author_id:
+        edit = render_to_string(EDIT_TEMPLATE, {"post": post})
+    return mark_safe(head + edit + tail)
+
+
+def benchmark(posts, viewer=None, rounds=50):
+    """Milliseconds spent rendering one page of ``posts`` through
+    ``includes/post_item.html`` as ``viewer`` sees it.
+
+    ``baseline`` renders every card in full, as post_item.html did before
+    the card cache; ``card_cache`` is post_item.html with every card
+    cached and ``card_cache_cold`` with none of them. All three go through
+    the project's template engine with the same request and viewer.
+    """
+    posts = list(posts)
+    request = RequestFactory().get("/")
+    request.user = viewer if viewer is not None else AnonymousUser()
+    keys = [card_key(post) for post in posts]
+
+    def timed(template_name, cold=False):
+        template = get_template(template_name)
+
+        def render_page():
+            return [template.render({"post": post}, request) for post in posts]
+
+        render_page()
+        elapsed = 0.0
+        for _ in range(rounds):
+            if cold:
+                cache.delete_many(keys)
+            started = time.perf_counter()
+            render_page()
+            elapsed += time.perf_counter() - started
+        return elapsed * 1000 / rounds
+
+    return {
+        "baseline": timed(BASELINE_TEMPLATE),
+        "card_cache": timed(ITEM_TEMPLATE),
+        "card_cache_cold": timed(ITEM_TEMPLATE, cold=True),
+    }
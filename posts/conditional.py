@@ -0,0 +1,137 @@
+import datetime as dt
+import hashlib
+from functools import wraps
+
+from django.db.models import DateTimeField, Max, OuterRef, Subquery
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from . import caching
+from .models import Comment, Follow, Group, Post, User
+
+
+def _latest(model, field, outer="pk"):
+    """Subquery of the newest ``updated`` of rows whose ``field`` is ``outer``."""
+    rows = (
+        model.objects.filter(**{field: OuterRef(outer)})
+        .order_by()
+        .values(field)
+        .annotate(last=Max("updated"))
+        .values("last")
+    )
+    return Subquery(rows, output_field=DateTimeField())
+
+
+def index_modified(request):
+    last = Post.objects.aggregate(last=Max("updated"))["last"]
+    return last, caching.page_scopes("index", {})
+
+
+def group_modified(request, slug):
+    rows = (
+        Group.objects.filter(slug=slug)
+        .annotate(last_post=_latest(Post, "group"))
+        .values_list("last_post", flat=True)
+    )
+    for last in rows:
+        return last, caching.page_scopes("group", {"slug": slug})
+    return None
+
+
+def profile_modified(request, username):
+    rows = (
+        User.objects.filter(username=username)
+        .annotate(
+            last_post=_latest(Post, "author"),
+            last_follower=_latest(Follow, "author"),
+            last_following=_latest(Follow, "user"),
+        )
+        .values_list("last_post", "last_follower", "last_following")
+    )
+    for moments in rows:
+        return _newest(*moments), caching.page_scopes("profile", {"username": username})
+    return None
+
+
+def post_modified(request, username, post_id):
+    rows = (
+        Post.objects.filter(pk=post_id, author__username=username)
+        .order_by()
+        .annotate(
+            last_comment=_latest(Comment, "post"),
+            last_follower=_latest(Follow, "author", "author"),
+        )
+        .values_list("updated", "last_comment", "last_follower")
+    )
+    for updated, comments, followers in rows:
+        kwargs = {"username": username, "post_id": post_id}
+        scopes = caching.page_scopes("post", kwargs)
+        return _newest(updated, comments, followers), scopes
+    return None
+
+
+def _newest(*moments):
+    moments = [moment for moment in moments if moment is not None]
+    return max(moments) if moments else None
+
+
+def _token_moment(token):
+    # Generation tokens are time.time_ns() of the last bump of a scope.
+    return dt.datetime.fromtimestamp(int(token) / 1e9, tz=dt.timezone.utc)
+
+
+def validators(request, last_modified, scopes):
+    """``(etag, last_modified)`` of a page showing the given scopes.
+
+    The ETag covers the generation tokens of the scopes and of the
+    viewer's own scope, the newest ``updated`` time of the rows the page
+    shows and the viewer. ``Last-Modified`` is
+    the later of that time and the last bump of a scope, because deletions
+    leave no ``updated`` time behind but do bump the scopes.
+    """
+    viewer = request.user.pk if request.user.is_authenticated else "anon"
+    if request.user.is_authenticated:
+        # What the page shows only this viewer, e.g. follow suggestions.
+        scopes = [*scopes, caching.scope("viewer", viewer)]
+    tokens = caching.generations(*scopes)
+    last_modified = _newest(last_modified, *map(_token_moment, tokens))
+    raw = "|".join([*scopes, *tokens, str(last_modified), str(viewer)])
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest()), last_modified
+
+
+def conditional(modified):
+    """Answer conditional GETs of a read view before it runs.
+
+    ``modified(request, *args, **kwargs)`` runs one query and returns
+    ``(newest updated time, cache scopes)`` of the page, or None when the
+    view should handle the request itself (e.g. to render a 404).
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            found = modified(request, *args, **kwargs)
+            if found is None:
+                return view(request, *args, **kwargs)
+
+            etag, last_modified = validators(request, *found)
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.setdefault("ETag", etag)
+                if timestamp is not None:
+                    response.setdefault("Last-Modified", http_date(timestamp))
+                # Browsers must ask again every time instead of guessing
+                # a freshness lifetime from Last-Modified.
+                patch_cache_control(response, no_cache=True)
+            return response
+
+        return inner
+
+    return decorator
@@ -0,0 +1,125 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Comment, Follow, Group, Post, User, UserStats
+
+
+def stats_for(user):
+    """Counters of a user, using a ``select_related("stats")`` row if present."""
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        return UserStats.objects.get_or_create(user=user)[0]
+
+
+def _shift(queryset, field, delta, **changes):
+    if delta < 0:
+        # Never push a drifted counter below zero; repair() fixes it later.
+        queryset = queryset.filter(**{f"{field}__gte": -delta})
+    queryset.update(**{field: F(field) + delta}, **changes)
+
+
+def post_created(post):
+    _shift(UserStats.objects.filter(user_id=post.author_id), "posts_count", 1)
+    if post.group_id is not None:
+        _shift(Group.objects.filter(pk=post.group_id), "posts_count", 1)
+
+
+def post_deleted(post):
+    _shift(UserStats.objects.filter(user_id=post.author_id), "posts_count", -1)
+    if post.group_id is not None:
+        _shift(Group.objects.filter(pk=post.group_id), "posts_count", -1)
+
+
+def post_moved(old_group_id, new_group_id):
+    if old_group_id is not None:
+        _shift(Group.objects.filter(pk=old_group_id), "posts_count", -1)
+    if new_group_id is not None:
+        _shift(Group.objects.filter(pk=new_group_id), "posts_count", 1)
+
+
+def comment_created(comment):
+    # The count is shown on the post's card, so the card has changed.
+    post = Post.objects.filter(pk=comment.post_id)
+    _shift(post, "comments_count", 1, updated=timezone.now())
+
+
+def comment_deleted(comment):
+    post = Post.objects.filter(pk=comment.post_id)
+    _shift(post, "comments_count", -1, updated=timezone.now())
+
+
+def follow_created(follow):
+    _shift(UserStats.objects.filter(user_id=follow.author_id), "followers_count", 1)
+    _shift(UserStats.objects.filter(user_id=follow.user_id), "following_count", 1)
+
+
+def follow_deleted(follow):
+    _shift(UserStats.objects.filter(user_id=follow.author_id), "followers_count", -1)
+    _shift(UserStats.objects.filter(user_id=follow.user_id), "following_count", -1)
+
+
+def follows_changed(user_id, author_ids, delta):
+    """Counters after ``user_id`` (un)followed all of ``author_ids`` at once."""
+    authors = UserStats.objects.filter(user_id__in=author_ids)
+    _shift(authors, "followers_count", delta)
+    user = UserStats.objects.filter(user_id=user_id)
+    _shift(user, "following_count", delta * len(author_ids))
+
+
+def _counted(model, field, outer="pk"):
+    rows = (
+        model.objects.filter(**{field: OuterRef(outer)})
+        .order_by()
+        .values(field)
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+# (queryset, counter field, expression computing the real value)
+def _checks():
+    return [
+        (Post.objects.all(), "comments_count", _counted(Comment, "post")),
+        (Group.objects.all(), "posts_count", _counted(Post, "group")),
+        (UserStats.objects.all(), "posts_count", _counted(Post, "author", "user")),
+        (
+            UserStats.objects.all(),
+            "followers_count",
+            _counted(Follow, "author", "user"),
+        ),
+        (
+            UserStats.objects.all(),
+            "following_count",
+            _counted(Follow, "user", "user"),
+        ),
+    ]
+
+
+def repair(fix=True):
+    """Compare every counter with the rows it counts.
+
+    Returns a list of ``(model name, pk, field, stored, actual)`` tuples
+    describing the drift found; with ``fix`` the stored values are
+    corrected as well. Missing ``UserStats`` rows are created first.
+    """
+    if fix:
+        missing = User.objects.filter(stats__isnull=True).values_list("pk", flat=True)
+        UserStats.objects.bulk_create(
+            [UserStats(user_id=pk) for pk in missing], batch_size=500
+        )
+
+    drift = []
+    for queryset, field, actual in _checks():
+        rows = (
+            queryset.annotate(actual=actual)
+            .exclude(**{field: F("actual")})
+            .values_list("pk", field, "actual")
+        )
+        for pk, stored, real in rows:
+            drift.append((queryset.model.__name__, pk, field, stored, real))
+            if fix:
+                queryset.filter(pk=pk).update(**{field: real})
+    return drift
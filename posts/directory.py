@@ -0,0 +1,107 @@
+import json
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Max
+
+from . import caching
+from .models import Group, GroupAuthor, Post
+
+# Most active authors shown per group.
+TOP_AUTHORS = 3
+
+BATCH_SIZE = 500
+
+
+def _top_authors(rows):
+    pairs = [[username, count] for username, count in rows]
+    return json.dumps(pairs) if pairs else ""
+
+
+def _refresh(group_id):
+    """Recompute a group's newest post and top authors from the indexes."""
+    latest = Post.objects.filter(group_id=group_id).aggregate(last=Max("pub_date"))
+    top = (
+        GroupAuthor.objects.filter(group_id=group_id)
+        .order_by("-posts_count", "author_id")
+        .values_list("author__username", "posts_count")[:TOP_AUTHORS]
+    )
+    Group.objects.filter(pk=group_id).update(
+        last_post_at=latest["last"], top_authors=_top_authors(top)
+    )
+
+
+def _shift(group_id, author_id, delta):
+    rows = GroupAuthor.objects.filter(group_id=group_id, author_id=author_id)
+    if delta > 0:
+        GroupAuthor.objects.bulk_create(
+            [GroupAuthor(group_id=group_id, author_id=author_id)],
+            ignore_conflicts=True,
+        )
+        rows.update(posts_count=F("posts_count") + delta)
+    else:
+        rows.filter(posts_count__lte=-delta).delete()
+        rows.update(posts_count=F("posts_count") + delta)
+
+
+def post_moved(post, old_group_id, new_group_id):
+    """Update the aggregates of the groups a post left and entered.
+
+    A new post moves in from no group and a deleted one out to none.
+    """
+    moved = [
+        (group_id, delta)
+        for group_id, delta in ((old_group_id, -1), (new_group_id, 1))
+        if group_id is not None
+    ]
+    for group_id, delta in moved:
+        _shift(group_id, post.author_id, delta)
+        _refresh(group_id)
+    if moved:
+        caching.bump(caching.scope("groups"))
+
+
+def groups():
+    """Every group with its aggregates, most recently active first.
+
+    One query over the ``last_post_at`` index whatever the number of
+    groups; ``authors`` is filled in from the stored JSON.
+    """
+    listing = list(Group.objects.order_by("-last_post_at", "-pk"))
+    for group in listing:
+        group.authors = [
+            {"username": username, "posts_count": count}
+            for username, count in json.loads(group.top_authors or "[]")
+        ]
+    return listing
+
+
+@transaction.atomic
+def rebuild():
+    """Recompute every group's aggregates from its posts."""
+    rows = (
+        Post.objects.filter(group__isnull=False)
+        .order_by()
+        .values_list("group_id", "author_id", "author__username")
+        .annotate(posts=Count("pk"))
+    )
+    GroupAuthor.objects.all().delete()
+    authors = defaultdict(list)
+    counts = []
+    for group_id, author_id, username, posts in rows:
+        counts.append(
+            GroupAuthor(group_id=group_id, author_id=author_id, posts_count=posts)
+        )
+        authors[group_id].append((-posts, author_id, username))
+    GroupAuthor.objects.bulk_create(counts, batch_size=BATCH_SIZE)
+
+    listing = list(Group.objects.annotate(last=Max("groups_posts__pub_date")))
+    for group in listing:
+        top = sorted(authors[group.pk])[:TOP_AUTHORS]
+        group.last_post_at = group.last
+        group.top_authors = _top_authors((name, -posts) for posts, _, name in top)
+    Group.objects.bulk_update(
+        listing, ["last_post_at", "top_authors"], batch_size=BATCH_SIZE
+    )
+    caching.bump(caching.scope("groups"))
+    return len(listing)
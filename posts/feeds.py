@@ -0,0 +1,13 @@
+from .models import Post
+
+
+def feed_queryset(queryset=None):
+    """Posts ready to be rendered as feed cards.
+
+    Author and group are joined in the same query; the comment count is the
+    denormalized ``Post.comments_count`` column, so a card needs no queries
+    of its own.
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+    return queryset.select_related("author", "group")
@@ -0,0 +1,130 @@
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import transaction
+
+from . import caching, counters, suggestions, timeline, trending
+from .models import Follow, User
+
+FOLLOWS_PER_PAGE = 20
+
+# Direction -> (column of the user asked about, column of the neighbours).
+DIRECTIONS = {
+    "following": ("user_id", "author_id"),
+    "followers": ("author_id", "user_id"),
+}
+
+
+def _key(direction, user_id):
+    return f"posts:follow_graph:{direction}:{user_id}"
+
+
+def _neighbours(direction, user_id):
+    key = _key(direction, user_id)
+    ids = cache.get(key)
+    if ids is None:
+        column, other = DIRECTIONS[direction]
+        rows = Follow.objects.filter(**{column: user_id}).values_list(other, flat=True)
+        ids = frozenset(rows)
+        cache.set(key, ids, caching.feed_cache_timeout())
+    return ids
+
+
+def following(user_id):
+    """Ids of the authors the user follows, as a cached frozenset."""
+    return _neighbours("following", user_id)
+
+
+def followers(user_id):
+    """Ids of the users following the author, as a cached frozenset."""
+    return _neighbours("followers", user_id)
+
+
+def is_following(user_id, author_id):
+    return author_id in following(user_id)
+
+
+def following_among(user_id, author_ids):
+    """The ids in ``author_ids`` the user follows, with one cache lookup.
+
+    ``user_id`` may be None for anonymous readers, who follow nobody.
+    """
+    if user_id is None:
+        return set()
+    return following(user_id) & set(author_ids)
+
+
+def forget(user_ids=(), author_ids=()):
+    """Drop the cached sets touched by follows of ``user_ids`` to ``author_ids``.
+
+    Inside a transaction they are dropped again on commit, like
+    ``caching.bump`` does, so sets read from pre-commit data go too.
+    """
+    keys = [_key("following", pk) for pk in user_ids]
+    keys += [_key("followers", pk) for pk in author_ids]
+
+    def drop():
+        cache.delete_many(keys)
+
+    drop()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(drop)
+
+
+def _page(users, number, per_page):
+    return Paginator(users.order_by("username"), per_page).get_page(number)
+
+
+def following_page(user_id, number=1, per_page=FOLLOWS_PER_PAGE):
+    """A page of the authors the user follows, by username."""
+    return _page(User.objects.filter(following__user_id=user_id), number, per_page)
+
+
+def followers_page(user_id, number=1, per_page=FOLLOWS_PER_PAGE):
+    """A page of the users following the author, by username."""
+    return _page(User.objects.filter(follower__author_id=user_id), number, per_page)
+
+
+@transaction.atomic
+def follow(user, author_ids):
+    """Make ``user`` follow every author in ``author_ids`` at once.
+
+    Authors already followed, the user themself and unknown ids are
+    skipped. Counters, timelines and caches are updated in bulk rather
+    than per row by the ``Follow`` signals. Returns the ids followed.
+    """
+    wanted = set(author_ids) - {user.pk}
+    wanted -= set(
+        Follow.objects.filter(user=user, author_id__in=wanted).values_list(
+            "author_id", flat=True
+        )
+    )
+    authors = list(User.objects.filter(pk__in=wanted).only("pk", "username"))
+    if not authors:
+        return set()
+    follows = [Follow(user=user, author=author) for author in authors]
+    Follow.objects.bulk_create(follows, ignore_conflicts=True)
+    ids = {author.pk for author in authors}
+    counters.follows_changed(user.pk, ids, 1)
+    for author_id in ids:
+        timeline.add_author(user.pk, author_id)
+    caching.invalidate_follows(user, authors)
+    forget([user.pk], ids)
+    suggestions.follows_changed(user.pk, ids)
+    for row in follows:
+        # The time saved on the row, which unfollowing takes back out.
+        trending.author_followed([row.author_id], row.updated)
+    return ids
+
+
+@transaction.atomic
+def unfollow(user, author_ids):
+    """Make ``user`` stop following the authors in ``author_ids``.
+
+    Each deleted ``Follow`` goes through the model signals. Returns the
+    ids unfollowed.
+    """
+    follows = Follow.objects.filter(user=user, author_id__in=set(author_ids))
+    ids = set(follows.values_list("author_id", flat=True))
+    if ids:
+        follows.delete()
+    return ids
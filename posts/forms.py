@@ -1,4 +1,5 @@
-from django.forms import ModelForm, Textarea
+from django.conf import settings
+from django.forms import ModelForm, Textarea, ValidationError
 from .models import Post, Comment
 
 
@@ -12,6 +13,15 @@ class PostForm(ModelForm):
             "image": "Добавьте картинку",
         }
 
+    def clean_image(self):
+        image = self.cleaned_data.get("image")
+        limit = getattr(settings, "POSTS_MAX_UPLOAD_SIZE", 20 * 1024 * 1024)
+        if image and image.size > limit:
+            raise ValidationError(
+                f"Файл слишком большой: не больше {limit // (1024 * 1024)} МБ."
+            )
+        return image
+
 
 class CommentForm(ModelForm):
     class Meta:
@@ -0,0 +1,114 @@
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from . import caching
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Pillow format -> file extension of normalized uploads.
+EXTENSIONS = {"WEBP": ".webp", "JPEG": ".jpg"}
+
+
+class InvalidImage(Exception):
+    pass
+
+
+def max_side():
+    return getattr(settings, "POSTS_IMAGE_MAX_SIDE", 2048)
+
+
+def image_format():
+    return getattr(settings, "POSTS_IMAGE_FORMAT", "WEBP")
+
+
+def image_quality():
+    return getattr(settings, "POSTS_IMAGE_QUALITY", 82)
+
+
+def pending():
+    """Posts whose uploaded image has not been normalized yet, oldest first."""
+    return (
+        Post.objects.exclude(image="")
+        .exclude(image__isnull=True)
+        .filter(image_width__isnull=True)
+        .order_by("pk")
+    )
+
+
+def _open(source):
+    try:
+        Image.open(source).verify()
+        source.seek(0)
+        return Image.open(source)
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as error:
+        raise InvalidImage(str(error))
+
+
+def normalize(name):
+    """Rewrite an uploaded image the way the site serves it.
+
+    Checks that the file is an image, applies its EXIF orientation, caps
+    its longer side at ``POSTS_IMAGE_MAX_SIDE`` and re-encodes it in
+    ``POSTS_IMAGE_FORMAT``, saving it next to the original. Touches
+    no database, so it can run in a worker process. Returns the new name,
+    width, height and size in bytes.
+    """
+    limit = max_side()
+    with default_storage.open(name) as source:
+        image = _open(source)
+        # Lets JPEG decode at a fraction of the size instead of in full.
+        image.draft("RGB", (limit, limit))
+        try:
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((limit, limit), Image.LANCZOS)
+        except (OSError, ValueError) as error:
+            raise InvalidImage(str(error))
+
+    kind = image_format()
+    has_alpha = "A" in image.getbands() or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha and kind == "WEBP" else "RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, kind, quality=image_quality(), optimize=True)
+
+    stem = os.path.splitext(name)[0]
+    data = ContentFile(buffer.getvalue())
+    return {
+        "name": default_storage.save(stem + EXTENSIONS[kind], data),
+        "width": image.width,
+        "height": image.height,
+        "size": len(buffer.getvalue()),
+    }
+
+
+def store(post_id, name, result):
+    """Point the post at its normalized image.
+
+    The original file is deleted once the post no longer refers to it. If
+    the post got another image while this one was processed, the new file
+    is dropped instead. Returns whether the post was updated.
+    """
+    updated = Post.objects.filter(pk=post_id, image=name).update(
+        image=result["name"],
+        image_width=result["width"],
+        image_height=result["height"],
+        image_size=result["size"],
+        thumbnails_ready=False,
+        thumbnails="",
+        updated=timezone.now(),
+    )
+    if not updated:
+        default_storage.delete(result["name"])
+        return False
+    if result["name"] != name:
+        default_storage.delete(name)
+    post = Post.objects.select_related("author", "group").get(pk=post_id)
+    caching.invalidate_post(post)
+    return True
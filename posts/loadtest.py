@@ -0,0 +1,228 @@
+import math
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from django.db import connections
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from .models import Group, Post, User
+
+ARGUMENT = re.compile(r"<(?:\w+:)?(\w+)>")
+
+# Status recorded for requests the server never answered.
+NO_RESPONSE = 0
+
+# Routes that would end the harness session when requested.
+SKIPPED = {"logout"}
+
+# Routes that change data; only driven when writes are requested.
+WRITES = {
+    "new_post": lambda sample: {"text": "load test post", "group": sample["group_id"]},
+    "add_comment": lambda sample: {"text": "load test comment"},
+    "post_edit": lambda sample: {"text": sample["post_text"]},
+    "profile_follow": None,
+    "profile_unfollow": None,
+}
+
+
+def named_patterns(resolver=None, prefix=""):
+    """Yield ``(name, pattern)`` for every named route of the project."""
+    resolver = resolver or get_resolver()
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            yield from named_patterns(pattern, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern.name, prefix + str(pattern.pattern)
+
+
+def sample_data(username=None):
+    """Existing rows to fill route arguments with."""
+    post = Post.objects.select_related("author", "group").order_by("-pk")
+    if username:
+        post = post.filter(author__username=username)
+    post = post.first()
+    group = Group.objects.order_by("-posts_count").first()
+    return {
+        "username": post.author.username if post else None,
+        "post_id": post.pk if post else None,
+        "post_text": post.text if post else "",
+        "slug": group.slug if group else None,
+        "group_id": group.pk if group else "",
+    }
+
+
+def _kwargs(pattern, sample):
+    """Route arguments filled from the sample, or None if one is unknown."""
+    kwargs = {}
+    for name in ARGUMENT.findall(pattern):
+        if sample.get(name) is None:
+            return None
+        kwargs[name] = sample[name]
+    return kwargs
+
+
+def build_routes(sample, writes=False):
+    """``(name, method, path, data)`` for every route that can be driven.
+
+    Returns the routes and the names of routes that had to be skipped.
+    """
+    routes, skipped = [], []
+    seen = set()
+    for name, pattern in named_patterns():
+        if name in seen:
+            continue
+        seen.add(name)
+        if name in SKIPPED or (name in WRITES and not writes):
+            skipped.append(name)
+            continue
+        kwargs = _kwargs(pattern, sample)
+        try:
+            path = reverse(name, kwargs=kwargs or None)
+        except Exception:
+            skipped.append(name)
+            continue
+        method, data = "GET", None
+        if name in WRITES and WRITES[name] is not None:
+            method, data = "POST", WRITES[name](sample)
+        routes.append((name, method, path, data))
+    return routes, skipped
+
+
+def percentile(values, share):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(math.ceil(share / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Harness:
+    """Drives project routes and measures latency and queries per request.
+
+    Requests go through the Django test client in-process, or over HTTP to
+    ``base_url`` when one is given (then queries cannot be counted).
+    """
+
+    def __init__(
+        self, concurrency=4, requests=20, username=None, base_url=None, cookie=None
+    ):
+        self.concurrency = concurrency
+        self.requests = requests
+        self.username = username
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.cookie = cookie
+        self.local = threading.local()
+
+    def client(self):
+        if not hasattr(self.local, "client"):
+            client = Client()
+            if self.username:
+                client.force_login(User.objects.get(username=self.username))
+            self.local.client = client
+        return self.local.client
+
+    def request_local(self, method, path, data):
+        counter = QueryCounter()
+        client = self.client()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                # Reads may be routed to a replica alias.
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                if method == "POST":
+                    status = client.post(path, data).status_code
+                else:
+                    status = client.get(path).status_code
+        except Exception:
+            # The test client re-raises view errors; count them like a 500.
+            status = 500
+        return status, time.perf_counter() - started, counter.count
+
+    def request_http(self, method, path, data):
+        body = None
+        if method == "POST":
+            body = urllib.parse.urlencode(data).encode()
+        request = urllib.request.Request(self.base_url + path, data=body)
+        if self.cookie:
+            request.add_header("Cookie", self.cookie)
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as error:
+            status = error.code
+        except OSError:
+            # URLError, a reset connection or a timeout: nothing answered.
+            status = NO_RESPONSE
+        return status, time.perf_counter() - started, None
+
+    def hit(self, route):
+        name, method, path, data = route
+        if self.base_url:
+            return self.request_http(method, path, data)
+        return self.request_local(method, path, data)
+
+    def run_route(self, run, route):
+        started = time.perf_counter()
+        results = list(run(self.hit, [route] * self.requests))
+        elapsed = time.perf_counter() - started
+
+        latencies = [seconds * 1000 for status, seconds, queries in results]
+        queries = [q for status, seconds, q in results if q is not None]
+        errors = sum(
+            1
+            for status, seconds, q in results
+            if status >= 500 or status == NO_RESPONSE
+        )
+        name, method, path, data = route
+        return {
+            "route": name,
+            "method": method,
+            "path": path,
+            "requests": len(results),
+            "errors": errors,
+            "statuses": sorted({status for status, seconds, q in results}),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "mean_queries": sum(queries) / len(queries) if queries else None,
+            "throughput_rps": len(results) / elapsed if elapsed else None,
+        }
+
+    def run(self, routes):
+        started = time.perf_counter()
+        if self.concurrency > 1:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                stats = [self.run_route(pool.map, route) for route in routes]
+        else:
+            stats = [self.run_route(map, route) for route in routes]
+        elapsed = time.perf_counter() - started
+        total = sum(item["requests"] for item in stats)
+        return {
+            "concurrency": self.concurrency,
+            "requests_per_route": self.requests,
+            "mode": "http" if self.base_url else "client",
+            "total_requests": total,
+            "elapsed_s": elapsed,
+            "throughput_rps": total / elapsed if elapsed else None,
+            "routes": stats,
+        }
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import cards
+from posts.feeds import feed_queryset
+from posts.pagination import POSTS_PER_PAGE
+
+
+class Command(BaseCommand):
+    help = (
+        "Time rendering a feed page through includes/post_item.html before "
+        "and after the per-post card cache, as the author of the first post "
+        "sees it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rounds", type=int, default=50)
+        parser.add_argument("--posts", type=int, default=POSTS_PER_PAGE)
+
+    def handle(self, *args, **options):
+        posts = list(feed_queryset()[: options["posts"]])
+        if not posts:
+            raise CommandError("Nothing to render; seed some data first.")
+
+        report = cards.benchmark(
+            posts, viewer=posts[0].author, rounds=options["rounds"]
+        )
+        baseline = report["baseline"]
+        self.stdout.write(f"{'mode':<16} {'ms/page':>8} {'speedup':>8}")
+        for mode, elapsed in report.items():
+            self.stdout.write(f"{mode:<16} {elapsed:>8.2f} {baseline / elapsed:>7.1f}x")
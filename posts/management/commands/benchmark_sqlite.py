@@ -0,0 +1,47 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import sqlite
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent read/write throughput of the stock SQLite setup "
+        "and the production profile on copies of the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=5.0)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--writers", type=int, default=1)
+        parser.add_argument(
+            "--mode", action="append", choices=sorted(sqlite.Benchmark.MODES)
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the JSON report to stdout."
+        )
+
+    def handle(self, *args, **options):
+        benchmark = sqlite.Benchmark(
+            seconds=options["seconds"],
+            readers=options["readers"],
+            writers=options["writers"],
+        )
+        report = benchmark.run(options["mode"])
+        if not report:
+            raise CommandError("Nothing to read; seed some data first.")
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
+            return
+        self.stdout.write(
+            f"{'mode':<12} {'reads/s':>10} {'writes/s':>10} {'errors':>8} {'ms/op':>8}"
+        )
+        for mode, row in report.items():
+            latency = row["mean_latency_ms"]
+            self.stdout.write(
+                f"{mode:<12} {row['reads_per_second']:>10.1f} "
+                f"{row['writes_per_second']:>10.1f} {row['errors']:>8} "
+                f"{latency if latency is None else round(latency, 2):>8}"
+            )
@@ -0,0 +1,41 @@
+import tarfile
+
+from django.core.management.base import BaseCommand
+
+from posts import ndjson
+
+
+class Command(BaseCommand):
+    help = "Stream users, groups, posts, comments and follows out as NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "output", nargs="?", default="-", help="File to write, - for stdout."
+        )
+        parser.add_argument(
+            "--images", help="Also write the posts' image files to this tar archive."
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        archive = None
+        if options["images"]:
+            archive = tarfile.open(options["images"], "w")
+        if options["output"] == "-":
+            # Lines already end with a newline.
+            output = self.stdout
+            output.ending = ""
+        else:
+            output = open(options["output"], "w", encoding="utf-8")
+        try:
+            written = ndjson.export(
+                output, images=archive, chunk_size=options["chunk_size"]
+            )
+        finally:
+            if output is not self.stdout:
+                output.close()
+            if archive is not None:
+                archive.close()
+
+        summary = ", ".join(f"{count} {model}s" for model, count in written.items())
+        self.stderr.write(f"Exported {summary}.")
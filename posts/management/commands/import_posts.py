@@ -0,0 +1,46 @@
+import sys
+import tarfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import ndjson
+
+
+class Command(BaseCommand):
+    help = (
+        "Load NDJSON written by export_posts, in batches and in a single pass. "
+        "Rows that already exist are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "input", nargs="?", default="-", help="File to read, - for stdin."
+        )
+        parser.add_argument(
+            "--images", help="Tar archive of image files written by export_posts."
+        )
+        parser.add_argument("--batch-size", type=int, default=ndjson.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options["images"]:
+            # Streamed in order: the archive is read once, start to end.
+            with tarfile.open(options["images"], "r|") as archive:
+                copied = ndjson.import_images(archive)
+            self.stdout.write(f"Copied {copied} image files")
+
+        source = sys.stdin
+        if options["input"] != "-":
+            source = open(options["input"], encoding="utf-8")
+        importer = ndjson.Importer(
+            batch_size=options["batch_size"], log=self.stdout.write
+        )
+        try:
+            created = importer.run(source)
+        except ndjson.ImportFailed as error:
+            raise CommandError(f"Import failed: {error}")
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        summary = ", ".join(f"{count} {model}s" for model, count in created.items())
+        self.stdout.write(self.style.SUCCESS(f"Imported {summary}."))
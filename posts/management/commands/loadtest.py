@@ -0,0 +1,80 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive every project route and report p50/p95/p99 latency, queries "
+        "per request and throughput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument(
+            "--requests", type=int, default=20, help="Requests sent to each route."
+        )
+        parser.add_argument(
+            "--user", help="Log in as this user; routes use one of their posts."
+        )
+        parser.add_argument(
+            "--writes",
+            action="store_true",
+            help="Also drive routes that create posts, comments and follows.",
+        )
+        parser.add_argument(
+            "--base-url",
+            help="Send HTTP requests to a running server instead of the test client.",
+        )
+        parser.add_argument("--cookie", help="Cookie header for --base-url requests.")
+        parser.add_argument("--route", action="append", help="Only drive these routes.")
+        parser.add_argument("--output", help="Write the JSON report to this file.")
+        parser.add_argument(
+            "--json", action="store_true", help="Print the JSON report to stdout."
+        )
+
+    def handle(self, *args, **options):
+        sample = loadtest.sample_data(options["user"])
+        routes, skipped = loadtest.build_routes(sample, writes=options["writes"])
+        if options["route"]:
+            routes = [route for route in routes if route[0] in options["route"]]
+        if not routes:
+            raise CommandError("No routes to drive; seed some data first.")
+
+        harness = loadtest.Harness(
+            concurrency=options["concurrency"],
+            requests=options["requests"],
+            username=options["user"],
+            base_url=options["base_url"],
+            cookie=options["cookie"],
+        )
+        report = harness.run(routes)
+        report["skipped"] = sorted(skipped)
+
+        text = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(text + "\n")
+        if options["json"]:
+            self.stdout.write(text)
+            return
+
+        self.stdout.write(
+            f"{'route':<24}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'queries':>9}{'rps':>9}{'errors':>8}"
+        )
+        for item in report["routes"]:
+            queries = item["mean_queries"]
+            self.stdout.write(
+                f"{item['route']:<24}{item['p50_ms']:>9.1f}{item['p95_ms']:>9.1f}"
+                f"{item['p99_ms']:>9.1f}"
+                f"{'-' if queries is None else format(queries, '.1f'):>9}"
+                f"{item['throughput_rps']:>9.1f}{item['errors']:>8}"
+            )
+        self.stdout.write(
+            f"{report['total_requests']} requests, "
+            f"{report['throughput_rps']:.1f} req/s overall; "
+            f"skipped: {', '.join(report['skipped']) or 'none'}"
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index over post texts."
+
+    def handle(self, *args, **options):
+        if not search.available():
+            raise CommandError("Full-text search needs the SQLite FTS5 extension.")
+        search.rebuild()
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
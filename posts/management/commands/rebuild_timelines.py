@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import timeline
+from posts.models import TimelineEntry, User
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized follow timelines from the Follow graph."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "usernames", nargs="*", help="Only rebuild timelines of these users."
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options["usernames"]:
+            users = User.objects.filter(username__in=options["usernames"])
+            user_ids = list(users.values_list("pk", flat=True))
+            if len(user_ids) != len(set(options["usernames"])):
+                raise CommandError("Some of the given users do not exist.")
+
+        timeline.rebuild(user_ids)
+
+        entries = TimelineEntry.objects.all()
+        if user_ids is not None:
+            entries = entries.filter(user_id__in=user_ids)
+        self.stdout.write(
+            self.style.SUCCESS(f"Timelines rebuilt: {entries.count()} entries.")
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts import trending
+
+
+class Command(BaseCommand):
+    help = "Recompute the trending score of every post from its activity."
+
+    def handle(self, *args, **options):
+        count = trending.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Trending scores rebuilt for {count} posts.")
+        )
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import replicas
+
+
+class Command(BaseCommand):
+    help = "Copy the primary database over every SQLite read replica."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep refreshing every this many seconds instead of once.",
+        )
+
+    def handle(self, *args, **options):
+        aliases = replicas.replica_aliases()
+        if not aliases:
+            raise CommandError("No replicas configured; set YATUBE_REPLICAS.")
+        while True:
+            started = time.monotonic()
+            for alias in aliases:
+                replicas.refresh(alias)
+            self.stdout.write(
+                f"Refreshed {', '.join(aliases)} "
+                f"in {time.monotonic() - started:.2f}s"
+            )
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
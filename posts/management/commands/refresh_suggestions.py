@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import suggestions
+from posts.models import UserStats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute follow suggestions of users whose follows changed, "
+        "outside of the request cycle."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait before polling for stale users again.",
+        )
+        parser.add_argument(
+            "--batch", type=int, default=100, help="Users refreshed per poll."
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process everything pending and exit instead of polling.",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute the suggestions of every user first.",
+        )
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            UserStats.objects.update(suggestions_stale=True)
+        refreshed = 0
+        while True:
+            batch = suggestions.stale(options["batch"])
+            for user_id in batch:
+                suggestions.refresh(user_id)
+            refreshed += len(batch)
+            if not batch:
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Suggestions refreshed for {refreshed} users.")
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = "Verify denormalized post, group and user counters and repair drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report drift, do not write anything.",
+        )
+
+    def handle(self, *args, **options):
+        drift = counters.repair(fix=not options["check"])
+        for model, pk, field, stored, actual in drift:
+            self.stdout.write(f"{model} {pk}: {field} is {stored}, expected {actual}")
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("All counters are in sync."))
+        elif options["check"]:
+            raise CommandError(f"{len(drift)} counters drifted.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{len(drift)} counters repaired."))
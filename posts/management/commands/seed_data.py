@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+
+from posts.seeding import Seeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-generate users, groups, posts, follows and comments with a "
+        "realistic long-tail skew, for load testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--groups", type=int, default=50)
+        parser.add_argument("--posts", type=int, default=20000)
+        parser.add_argument("--follows", type=int, default=20000)
+        parser.add_argument("--comments", type=int, default=50000)
+        parser.add_argument(
+            "--images",
+            type=float,
+            default=0.0,
+            help="Share of posts that get a generated image, from 0 to 1.",
+        )
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Zipf exponent of author, follow and comment popularity.",
+        )
+        parser.add_argument(
+            "--days", type=int, default=365, help="Spread of publication dates."
+        )
+        parser.add_argument(
+            "--prefix",
+            default="seed",
+            help="Prefix of generated usernames, slugs and image names.",
+        )
+        parser.add_argument("--seed", type=int, help="Random seed.")
+
+    def handle(self, *args, **options):
+        seeder = Seeder(
+            prefix=options["prefix"],
+            skew=options["skew"],
+            days=options["days"],
+            seed=options["seed"],
+            log=self.stdout.write,
+        )
+        seeder.run(
+            users=options["users"],
+            groups=options["groups"],
+            posts=options["posts"],
+            follows=options["follows"],
+            comments=options["comments"],
+            images=options["images"],
+        )
+        self.stdout.write(self.style.SUCCESS("Seeding finished."))
@@ -0,0 +1,128 @@
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts import images, thumbnails
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(row):
+    """Normalize one upload; runs in a worker process."""
+    pk, name = row
+    try:
+        return row, images.normalize(name)
+    except images.InvalidImage as error:
+        logger.warning("Post %s: %s is not a usable image: %s", pk, name, error)
+    except Exception:
+        logger.exception("Could not normalize %s", name)
+    return row, None
+
+
+def _process(row):
+    return row, thumbnails.generate(*row)
+
+
+def _in_thread(row):
+    try:
+        return _process(row)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        "Normalize newly uploaded post images in a process pool and generate "
+        "their thumbnails in a thread pool, outside of the request cycle."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=getattr(settings, "POSTS_THUMBNAIL_WORKERS", 2),
+            help="Number of images resized in parallel; 0 resizes them inline.",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=getattr(settings, "POSTS_IMAGE_PROCESSES", 2),
+            help="Processes normalizing uploads; 0 normalizes them inline.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait before polling for new uploads again.",
+        )
+        parser.add_argument(
+            "--batch", type=int, default=100, help="Posts fetched per poll."
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process everything pending and exit instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        failed = set()
+        processed = 0
+        pool = processes = None
+        run = normalize = map
+        if options["workers"] > 0:
+            pool = ThreadPoolExecutor(max_workers=options["workers"])
+            run = pool.map
+        if options["processes"] > 0:
+            # Decoding and encoding is CPU bound: give it real cores. The
+            # initializer sets Django up where processes are spawned.
+            processes = ProcessPoolExecutor(
+                max_workers=options["processes"], initializer=django.setup
+            )
+            normalize = processes.map
+
+        try:
+            while True:
+                uploads = list(
+                    images.pending()
+                    .exclude(pk__in=failed)
+                    .values_list("pk", "image")[: options["batch"]]
+                )
+                for (pk, name), result in normalize(_normalize, uploads):
+                    if result is None:
+                        failed.add(pk)
+                        self.stderr.write(f"Post {pk}: could not normalize {name}")
+                    else:
+                        images.store(pk, name, result)
+
+                batch = list(
+                    thumbnails.pending()
+                    .exclude(pk__in=failed)
+                    .values_list("pk", "image")[: options["batch"]]
+                )
+                task = _in_thread if pool else _process
+                results = run(task, batch)
+                for (pk, name), ok in results:
+                    if ok:
+                        processed += 1
+                    else:
+                        failed.add(pk)
+                        self.stderr.write(f"Post {pk}: could not process {name}")
+
+                if not uploads and not batch:
+                    if options["once"]:
+                        break
+                    time.sleep(options["interval"])
+        finally:
+            if pool:
+                pool.shutdown()
+            if processes:
+                processes.shutdown()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Thumbnails generated for {processed} posts.")
+        )
@@ -0,0 +1,180 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+
+# Upper bounds of the histogram buckets, in seconds and in queries.
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+_local = threading.local()
+
+
+class RequestTimings:
+    """What one request spent its time on, filled in while it runs."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def time_query(self, execute, sql, params, many, context):
+        """``connection.execute_wrapper`` hook counting queries."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+    def server_timing(self):
+        """Value of the ``Server-Timing`` response header."""
+        return ", ".join(
+            [
+                f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+                f"tpl;dur={self.template_time * 1000:.1f}",
+                f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+                f"total;dur={self.total_time * 1000:.1f}",
+            ]
+        )
+
+
+def start():
+    _local.timings = RequestTimings()
+    return _local.timings
+
+
+def current():
+    """Timings of the request running in this thread, if any."""
+    return getattr(_local, "timings", None)
+
+
+def finish():
+    _local.timings = None
+
+
+def record_cache(hits, misses=0):
+    timings = current()
+    if timings is not None:
+        timings.cache_hits += hits
+        timings.cache_misses += misses
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+
+
+def _labels(**labels):
+    pairs = (
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+class Registry:
+    """Per-route request metrics of this process.
+
+    Every worker process keeps its own registry, so each one has to be
+    scraped (or the numbers summed) to see the whole site.
+    """
+
+    HISTOGRAMS = (
+        ("request_duration_seconds", "Total request time.", SECONDS_BUCKETS),
+        ("request_db_seconds", "Time spent in database queries.", SECONDS_BUCKETS),
+        (
+            "request_template_seconds",
+            "Time spent rendering templates.",
+            SECONDS_BUCKETS,
+        ),
+        ("request_queries", "Database queries per request.", QUERY_BUCKETS),
+    )
+
+    def __init__(self, prefix="yatube"):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {
+                name: defaultdict(lambda buckets=buckets: Histogram(buckets))
+                for name, help_text, buckets in self.HISTOGRAMS
+            }
+            self.requests = defaultdict(int)
+            self.cache = defaultdict(int)
+
+    def observe(self, route, method, status, timings):
+        values = {
+            "request_duration_seconds": timings.total_time,
+            "request_db_seconds": timings.db_time,
+            "request_template_seconds": timings.template_time,
+            "request_queries": timings.queries,
+        }
+        with self.lock:
+            for name, value in values.items():
+                self.histograms[name][route].observe(value)
+            self.requests[route, method, status] += 1
+            self.cache[route, "hit"] += timings.cache_hits
+            self.cache[route, "miss"] += timings.cache_misses
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for name, help_text, buckets in self.HISTOGRAMS:
+                metric = f"{self.prefix}_{name}"
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} histogram")
+                for route, histogram in sorted(self.histograms[name].items()):
+                    for bound, count in histogram.cumulative():
+                        labels = _labels(route=route, le=bound)
+                        lines.append(f"{metric}_bucket{labels} {count}")
+                    labels = _labels(route=route, le="+Inf")
+                    lines.append(f"{metric}_bucket{labels} {histogram.count}")
+                    labels = _labels(route=route)
+                    lines.append(f"{metric}_sum{labels} {histogram.sum}")
+                    lines.append(f"{metric}_count{labels} {histogram.count}")
+
+            metric = f"{self.prefix}_requests_total"
+            lines.append(f"# HELP {metric} Requests by route, method and status.")
+            lines.append(f"# TYPE {metric} counter")
+            for (route, method, status), count in sorted(self.requests.items()):
+                labels = _labels(route=route, method=method, status=status)
+                lines.append(f"{metric}{labels} {count}")
+
+            metric = f"{self.prefix}_cache_requests_total"
+            lines.append(f"# HELP {metric} Cache lookups by route and result.")
+            lines.append(f"# TYPE {metric} counter")
+            for (route, result), count in sorted(self.cache.items()):
+                labels = _labels(route=route, result=result)
+                lines.append(f"{metric}{labels} {count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
@@ -0,0 +1,137 @@
+import hashlib
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.urls import Resolver404, resolve
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from . import caching, metrics, replicas
+
+# Vary headers a cached anonymous page may carry: every request served
+# from the cache has no session cookie, and nothing compresses pages.
+SAFE_VARY = {"cookie", "accept-encoding"}
+
+
+def route_name(request):
+    """Metric label of the route that served the request."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    return match.view_name or match._func_path
+
+
+class InstrumentationMiddleware:
+    """Measures every request and records it in ``posts.metrics``.
+
+    Counts database queries and their time on all connections, and picks
+    up template render time and cache hits and misses reported by the
+    instrumented backends. Adds a ``Server-Timing`` header so the numbers
+    show up in the browser's network panel.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = metrics.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings.time_query))
+                response = self.get_response(request)
+            response["Server-Timing"] = timings.server_timing()
+            metrics.registry.observe(
+                route_name(request), request.method, response.status_code, timings
+            )
+            return response
+        finally:
+            metrics.finish()
+
+
+class AnonymousPageCacheMiddleware:
+    """Serves whole pages to logged-out readers from the cache.
+
+    Only the pages listed in ``caching.PAGE_SCOPES`` are cached, keyed by
+    their full URL and the generations of the scopes the URL names, so a
+    write bumping those scopes orphans the cached copies. Requests with a
+    session cookie always reach the view. A hit runs no database query:
+    it sits before the session and auth middleware and the scopes come
+    from the URL alone.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        key = self.cache_key(request)
+        if key is None:
+            return self.get_response(request)
+
+        rendered = []
+
+        def render():
+            response = self.get_response(request)
+            rendered.append(response)
+            if request.method == "GET" and self.cacheable(response):
+                return response
+            return None
+
+        # With a single-flight backend, concurrent misses of a page wait
+        # for one render instead of each running the view.
+        response = cache.get_or_set(key, render, caching.page_cache_timeout())
+        if rendered:
+            return rendered[0]
+        last_modified = parse_http_date_safe(response.get("Last-Modified", ""))
+        return get_conditional_response(
+            request,
+            etag=response.get("ETag"),
+            last_modified=last_modified,
+            response=response,
+        )
+
+    def cache_key(self, request):
+        if request.method not in ("GET", "HEAD"):
+            return None
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if match.namespace or match.url_name not in caching.PAGE_SCOPES:
+            return None
+        request.resolver_match = match
+
+        scopes = caching.page_scopes(match.url_name, match.kwargs)
+        raw = "|".join([request.build_absolute_uri(), *caching.generations(*scopes)])
+        return f"posts:page:{hashlib.md5(raw.encode()).hexdigest()}"
+
+    def cacheable(self, response):
+        if response.status_code != 200 or response.streaming or response.cookies:
+            return False
+        vary = response.get("Vary", "")
+        names = {name.strip().lower() for name in vary.split(",") if name.strip()}
+        return names <= SAFE_VARY
+
+
+class ReplicaPinMiddleware:
+    """Pins a session to the primary database after it writes.
+
+    Reads of ``replicas.read_replica`` views then stay on the primary for
+    ``POSTS_REPLICA_PIN_SECONDS``, long enough for the replicas to catch
+    up with the write.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        replicas.reset()
+        response = self.get_response(request)
+        # Any method: following someone is a GET link.
+        if replicas.wrote():
+            replicas.pin(request)
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 02:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0009_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="thumbnails_ready",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from posts import search
+
+
+def create_index(apps, schema_editor):
+    search.rebuild(schema_editor.connection)
+
+
+def drop_index(apps, schema_editor):
+    if not search.available(schema_editor.connection):
+        return
+    for trigger in ("insert", "delete", "update"):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {search.TABLE}_{trigger}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {search.TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0011_feed_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
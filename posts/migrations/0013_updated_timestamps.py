@@ -0,0 +1,56 @@
+# Generated by Django 2.2.28 on 2026-10-18 02:31
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_updated(apps, schema_editor):
+    # Existing rows were last changed no later than they were created.
+    Post = apps.get_model("posts", "Post")
+    Comment = apps.get_model("posts", "Comment")
+    Post.objects.update(updated=F("pub_date"))
+    Comment.objects.update(updated=F("created"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0012_post_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="updated",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="follow",
+            name="updated",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="post",
+            name="updated",
+            field=models.DateTimeField(auto_now=True, verbose_name="Дата изменения"),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["updated"], name="posts_post_updated_c58def_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["author", "updated"], name="posts_post_author__179e84_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["group", "updated"], name="posts_post_group_i_7ae3e8_idx"
+            ),
+        ),
+        migrations.RunPython(fill_updated, migrations.RunPython.noop),
+    ]
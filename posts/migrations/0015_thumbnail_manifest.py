@@ -0,0 +1,28 @@
+# Generated by Django 2.2.28 on 2026-10-18 02:58
+
+from django.db import migrations, models
+
+
+def queue_missing_manifests(apps, schema_editor):
+    # Thumbnails made before the manifest existed are unknown to it; let
+    # the thumbnail worker make them again.
+    Post = apps.get_model("posts", "Post")
+    Post.objects.exclude(image="").exclude(image__isnull=True).filter(
+        thumbnails=""
+    ).update(thumbnails_ready=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0014_image_dimensions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="thumbnails",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.RunPython(queue_missing_manifests, migrations.RunPython.noop),
+    ]
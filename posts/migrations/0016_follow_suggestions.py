@@ -0,0 +1,63 @@
+# Generated by Django 2.2.28 on 2026-10-18 03:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("posts", "0015_thumbnail_manifest"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userstats",
+            name="suggestions_stale",
+            field=models.BooleanField(default=True),
+        ),
+        migrations.CreateModel(
+            name="FollowSuggestion",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField()),
+                (
+                    "author",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="follow_suggestions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="followsuggestion",
+            index=models.Index(
+                fields=["user", "-score", "author"],
+                name="posts_follo_user_id_b7495d_idx",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="followsuggestion",
+            unique_together={("user", "author")},
+        ),
+    ]
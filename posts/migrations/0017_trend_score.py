@@ -0,0 +1,66 @@
+# Generated by Django 2.2.28 on 2026-10-18 03:08
+
+import datetime as dt
+import math
+
+from django.conf import settings
+from django.db import migrations, models
+
+# The scoring of posts.trending as it stood when this migration was
+# written, copied so that later changes there cannot alter it.
+EPOCH = dt.datetime(2020, 1, 1, tzinfo=dt.timezone.utc)
+POST_WEIGHT = 1.0
+COMMENT_WEIGHT = 1.0
+
+
+def log_weight(weight, moment, half_life):
+    elapsed = (moment - EPOCH).total_seconds()
+    return math.log(weight) + elapsed * math.log(2) / half_life
+
+
+def log_add(a, b):
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def fill_trend_score(apps, schema_editor):
+    # Same scores posts.trending.rebuild() computes, follows aside: they
+    # are picked up by the next "manage.py rebuild_trending".
+    Post = apps.get_model("posts", "Post")
+    Comment = apps.get_model("posts", "Comment")
+    half_life = getattr(settings, "POSTS_TREND_HALF_LIFE", 12 * 60 * 60)
+    scores = {
+        pk: log_weight(POST_WEIGHT, pub_date, half_life)
+        for pk, pub_date in Post.objects.values_list("pk", "pub_date").iterator()
+    }
+    comments = Comment.objects.values_list("post_id", "created")
+    for post_id, created in comments.iterator():
+        event = log_weight(COMMENT_WEIGHT, created, half_life)
+        scores[post_id] = log_add(scores[post_id], event)
+    Post.objects.bulk_update(
+        [Post(pk=pk, trend_score=score) for pk, score in scores.items()],
+        ["trend_score"],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("posts", "0016_follow_suggestions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="trend_score",
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["trend_score"], name="posts_post_trend_s_fc779e_idx"
+            ),
+        ),
+        migrations.RunPython(fill_trend_score, migrations.RunPython.noop),
+    ]
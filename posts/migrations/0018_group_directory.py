@@ -0,0 +1,109 @@
+# Generated by Django 2.2.28 on 2026-10-18 03:11
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import json
+from collections import defaultdict
+
+
+def fill_group_stats(apps, schema_editor):
+    # What posts.directory.rebuild() stores, from the historical models.
+    Group = apps.get_model("posts", "Group")
+    GroupAuthor = apps.get_model("posts", "GroupAuthor")
+    Post = apps.get_model("posts", "Post")
+    rows = (
+        Post.objects.filter(group__isnull=False)
+        .order_by()
+        .values_list("group_id", "author_id", "author__username")
+        .annotate(posts=models.Count("pk"))
+    )
+    authors = defaultdict(list)
+    counts = []
+    for group_id, author_id, username, posts in rows:
+        counts.append(
+            GroupAuthor(group_id=group_id, author_id=author_id, posts_count=posts)
+        )
+        authors[group_id].append((-posts, author_id, username))
+    GroupAuthor.objects.bulk_create(counts, batch_size=500)
+
+    listing = list(Group.objects.annotate(last=models.Max("groups_posts__pub_date")))
+    for group in listing:
+        top = sorted(authors[group.pk])[:3]
+        group.last_post_at = group.last
+        pairs = [[name, -posts] for posts, _, name in top]
+        group.top_authors = json.dumps(pairs) if pairs else ""
+    Group.objects.bulk_update(listing, ["last_post_at", "top_authors"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("posts", "0017_trend_score"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GroupAuthor",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("posts_count", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="group",
+            name="last_post_at",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="group",
+            name="top_authors",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="group",
+            index=models.Index(
+                fields=["last_post_at"], name="posts_group_last_po_a926d4_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="groupauthor",
+            name="author",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="group_authors",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="groupauthor",
+            name="group",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="group_authors",
+                to="posts.Group",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="groupauthor",
+            index=models.Index(
+                fields=["group", "-posts_count", "author"],
+                name="posts_group_group_i_6336a9_idx",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="groupauthor",
+            unique_together={("group", "author")},
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
@@ -8,6 +8,14 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
+    # Kept up to date by posts.directory for the group listing: the newest
+    # post's date and JSON of the most active [username, posts] pairs.
+    last_post_at = models.DateTimeField(null=True, editable=False)
+    top_authors = models.TextField(blank=True, default="", editable=False)
+
+    class Meta:
+        indexes = [models.Index(fields=["last_post_at"])]
 
     def __str__(self):
         return self.title
@@ -16,34 +24,137 @@ class Group(models.Model):
 class Post(models.Model):
     text = models.TextField()
     pub_date = models.DateTimeField(auto_now_add=True, verbose_name="Дата публикации")
-    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="posts")
+    # Both keys lead a composite (key, pub_date) index declared in Meta.
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="posts", db_index=False
+    )
     group = models.ForeignKey(
         Group,
         on_delete=models.SET_NULL,
+        db_index=False,
         related_name="groups_posts",
         blank=True,
         null=True,
         verbose_name="Группа",
     )
     image = models.ImageField(upload_to="posts/", blank=True, null=True)
+    thumbnails_ready = models.BooleanField(default=False, editable=False)
+    # Written by the thumbnail worker: size name -> [file, width, height],
+    # so cards render their <img> without asking sorl's key-value store.
+    thumbnails = models.TextField(blank=True, default="", editable=False)
+    # Filled in by the thumbnail worker once it has normalized the upload.
+    image_width = models.PositiveIntegerField(null=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, editable=False)
+    image_size = models.PositiveIntegerField(null=True, editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    # Last change of anything the post's card shows; read by posts.conditional.
+    updated = models.DateTimeField(auto_now=True, verbose_name="Дата изменения")
+    # Time-decayed activity in log space, kept up to date by posts.trending.
+    trend_score = models.FloatField(default=0.0, editable=False)
 
     class Meta:
         ordering = ["-pub_date"]
+        # Ascending on purpose: walked backwards they serve both
+        # "-pub_date" and the keyset order "-pub_date, -id" via the rowid.
+        # The "updated" ones answer MAX(updated) of a feed from the index,
+        # and "trend_score" serves the trending feed the same way.
+        indexes = [
+            models.Index(fields=["pub_date"]),
+            models.Index(fields=["author", "pub_date"]),
+            models.Index(fields=["group", "pub_date"]),
+            models.Index(fields=["updated"]),
+            models.Index(fields=["author", "updated"]),
+            models.Index(fields=["group", "updated"]),
+            models.Index(fields=["trend_score"]),
+        ]
 
     def __str__(self):
         return self.text
 
 
 class Comment(models.Model):
-    post = models.ForeignKey(Post, on_delete=models.PROTECT, related_name="comments")
+    post = models.ForeignKey(
+        Post, on_delete=models.PROTECT, related_name="comments", db_index=False
+    )
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="comments")
     text = models.TextField(verbose_name="Текст комментария")
     created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["post", "created"])]
 
 
 class Follow(models.Model):
     user = models.ForeignKey(User, on_delete=models.PROTECT, related_name="follower")
-    author = models.ForeignKey(User, on_delete=models.PROTECT, related_name="following")
+    author = models.ForeignKey(
+        User, on_delete=models.PROTECT, related_name="following", db_index=False
+    )
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("user", "author")
+        indexes = [models.Index(fields=["author", "user"])]
+
+
+class GroupAuthor(models.Model):
+    """Number of posts an author has in a group, kept by ``posts.directory``."""
+
+    group = models.ForeignKey(
+        Group, on_delete=models.CASCADE, related_name="group_authors", db_index=False
+    )
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="group_authors"
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("group", "author")
+        indexes = [models.Index(fields=["group", "-posts_count", "author"])]
+
+
+class UserStats(models.Model):
+    """Denormalized per-user counters, kept in sync by ``posts.counters``."""
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    # Set when a follow changes the user's suggestions; cleared by the
+    # refresh_suggestions worker.
+    suggestions_stale = models.BooleanField(default=True)
+
+
+class TimelineEntry(models.Model):
+    """A post delivered to a follower's feed (fan-out on write)."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="timeline")
+    post = models.ForeignKey(
+        Post, on_delete=models.CASCADE, related_name="timeline_entries"
+    )
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-pub_date", "-post_id"]
+        unique_together = ("user", "post")
+        indexes = [
+            models.Index(fields=["user", "-pub_date", "-post"]),
+            models.Index(fields=["user", "author"]),
+        ]
+
+
+class FollowSuggestion(models.Model):
+    """An author worth following, precomputed by ``posts.suggestions``."""
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="follow_suggestions"
+    )
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
 
     class Meta:
         unique_together = ("user", "author")
+        indexes = [models.Index(fields=["user", "-score", "author"])]
@@ -0,0 +1,314 @@
+import datetime as dt
+import json
+import os
+import tarfile
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from . import counters, directory, timeline, trending
+from .models import Comment, Follow, Group, Post, User
+from .seeding import BATCH_SIZE, manual_dates
+
+# Models in file order: every row only refers to rows of earlier models,
+# which is what lets the import resolve keys in a single pass.
+MODELS = ("user", "group", "post", "comment", "follow")
+
+# Output name -> lookup, per model. Foreign keys are exported as natural
+# keys: usernames, group slugs and (author, pub_date) pairs for posts.
+FIELDS = {
+    "user": {
+        "username": "username",
+        "email": "email",
+        "first_name": "first_name",
+        "last_name": "last_name",
+        "password": "password",
+        "date_joined": "date_joined",
+        "is_active": "is_active",
+    },
+    "group": {"slug": "slug", "title": "title", "description": "description"},
+    "post": {
+        "author": "author__username",
+        "pub_date": "pub_date",
+        "updated": "updated",
+        "group": "group__slug",
+        "text": "text",
+        "image": "image",
+        "image_width": "image_width",
+        "image_height": "image_height",
+        "image_size": "image_size",
+    },
+    "comment": {
+        "post_author": "post__author__username",
+        "post_pub_date": "post__pub_date",
+        "author": "author__username",
+        "created": "created",
+        "updated": "updated",
+        "text": "text",
+    },
+    "follow": {
+        "user": "user__username",
+        "author": "author__username",
+        "updated": "updated",
+    },
+}
+
+QUERYSETS = {
+    "user": lambda: User.objects.all(),
+    "group": lambda: Group.objects.all(),
+    "post": lambda: Post.objects.all(),
+    "comment": lambda: Comment.objects.all(),
+    "follow": lambda: Follow.objects.all(),
+}
+
+
+class ImportFailed(Exception):
+    pass
+
+
+def _default(value):
+    # Full precision: a post's pub_date is part of its natural key.
+    if isinstance(value, dt.datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def export(output, images=None, chunk_size=2000):
+    """Write every user, group, post, comment and follow as NDJSON lines.
+
+    Rows are read with chunked ``.values().iterator()`` queries, so memory
+    use does not grow with the data set. ``images`` is an open
+    ``tarfile.TarFile`` that receives the posts' image files.
+    Returns the number of rows written per model.
+    """
+    written = {}
+    for model in MODELS:
+        fields = FIELDS[model]
+        rows = QUERYSETS[model]().order_by("pk").values(*fields.values())
+        written[model] = 0
+        for row in rows.iterator(chunk_size=chunk_size):
+            data = {"model": model}
+            data.update((name, row[lookup]) for name, lookup in fields.items())
+            output.write(json.dumps(data, default=_default, ensure_ascii=False) + "\n")
+            written[model] += 1
+            if images is not None and model == "post" and data["image"]:
+                _add_image(images, data["image"])
+    return written
+
+
+def _add_image(archive, name):
+    if not default_storage.exists(name):
+        return
+    info = tarfile.TarInfo(name)
+    info.size = default_storage.size(name)
+    with default_storage.open(name) as source:
+        archive.addfile(info, source)
+
+
+def import_images(archive):
+    """Copy image files from an export archive into the media storage.
+
+    Files that already exist are kept. Returns the number of files copied.
+    """
+    copied = 0
+    for member in archive:
+        name = os.path.normpath(member.name)
+        if not member.isfile() or name.startswith(("..", "/")):
+            continue
+        if default_storage.exists(name):
+            continue
+        default_storage.save(name, archive.extractfile(member))
+        copied += 1
+    return copied
+
+
+class Importer:
+    """Loads NDJSON written by ``export`` in a single streaming pass.
+
+    Rows are buffered per model and written with ``bulk_create`` one batch
+    at a time; the foreign keys of a batch are resolved by natural key
+    with one query per referenced model. Rows whose natural key already
+    exists are skipped, so an interrupted import can simply be rerun.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, log=None):
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.created = {model: 0 for model in MODELS}
+
+    def run(self, lines):
+        model, batch = None, []
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                kind = row.pop("model")
+            except (ValueError, KeyError) as error:
+                raise ImportFailed(f"line {number}: {error}")
+            if kind not in FIELDS:
+                raise ImportFailed(f"line {number}: unknown model {kind!r}")
+            if kind != model or len(batch) >= self.batch_size:
+                self.flush(model, batch)
+                model, batch = kind, []
+            batch.append(row)
+        self.flush(model, batch)
+
+        self.log("Rebuilding timelines and counters")
+        timeline.rebuild()
+        counters.repair()
+        trending.rebuild()
+        directory.rebuild()
+        cache.clear()
+        return self.created
+
+    def flush(self, model, rows):
+        if not rows:
+            return
+        with transaction.atomic():
+            created = getattr(self, f"create_{model}s")(rows)
+        self.created[model] += created
+
+    def ids(self, model, field, values):
+        values = set(values) - {None}
+        found = model.objects.filter(**{f"{field}__in": values})
+        found = dict(found.values_list(field, "pk"))
+        missing = values - set(found)
+        if missing:
+            name = model._meta.model_name
+            raise ImportFailed(f"unknown {name} {field}: {sorted(missing)[0]}")
+        return found
+
+    def post_ids(self, keys):
+        """Map ``(author, pub_date)`` natural keys to post ids."""
+        posts = Post.objects.filter(
+            author__username__in={author for author, moment in keys},
+            pub_date__in={moment for author, moment in keys},
+        ).values_list("author__username", "pub_date", "pk")
+        return {(author, moment): pk for author, moment, pk in posts}
+
+    def create_users(self, rows):
+        existing = set(
+            User.objects.filter(
+                username__in=[row["username"] for row in rows]
+            ).values_list("username", flat=True)
+        )
+        users = []
+        for row in rows:
+            if row["username"] in existing:
+                continue
+            row["date_joined"] = parse_datetime(row["date_joined"])
+            users.append(User(**row))
+        User.objects.bulk_create(users)
+        return len(users)
+
+    def create_groups(self, rows):
+        existing = set(
+            Group.objects.filter(slug__in=[row["slug"] for row in rows]).values_list(
+                "slug", flat=True
+            )
+        )
+        groups = [Group(**row) for row in rows if row["slug"] not in existing]
+        Group.objects.bulk_create(groups)
+        return len(groups)
+
+    def create_posts(self, rows):
+        for row in rows:
+            row["pub_date"] = parse_datetime(row["pub_date"])
+            row["updated"] = parse_datetime(row["updated"])
+        authors = self.ids(User, "username", (row["author"] for row in rows))
+        groups = self.ids(Group, "slug", (row["group"] for row in rows))
+        existing = self.post_ids([(row["author"], row["pub_date"]) for row in rows])
+
+        posts = []
+        for row in rows:
+            if (row["author"], row["pub_date"]) in existing:
+                continue
+            posts.append(
+                Post(
+                    author_id=authors[row["author"]],
+                    group_id=groups.get(row["group"]),
+                    pub_date=row["pub_date"],
+                    updated=row["updated"],
+                    text=row["text"],
+                    image=row["image"] or "",
+                    image_width=row.get("image_width"),
+                    image_height=row.get("image_height"),
+                    image_size=row.get("image_size"),
+                )
+            )
+        fields = (Post._meta.get_field("pub_date"), Post._meta.get_field("updated"))
+        with manual_dates(*fields):
+            Post.objects.bulk_create(posts)
+        return len(posts)
+
+    def create_comments(self, rows):
+        for row in rows:
+            row["post_pub_date"] = parse_datetime(row["post_pub_date"])
+            row["created"] = parse_datetime(row["created"])
+            row["updated"] = parse_datetime(row["updated"])
+        authors = self.ids(User, "username", (row["author"] for row in rows))
+        keys = {(row["post_author"], row["post_pub_date"]) for row in rows}
+        posts = self.post_ids(keys)
+        if keys - set(posts):
+            author, moment = sorted(keys - set(posts))[0]
+            raise ImportFailed(f"unknown post of {author} at {moment.isoformat()}")
+        existing = set(
+            Comment.objects.filter(
+                post_id__in=posts.values(),
+                created__in={row["created"] for row in rows},
+            ).values_list("post_id", "author_id", "created")
+        )
+
+        comments = []
+        for row in rows:
+            post_id = posts[row["post_author"], row["post_pub_date"]]
+            author_id = authors[row["author"]]
+            if (post_id, author_id, row["created"]) in existing:
+                continue
+            comments.append(
+                Comment(
+                    post_id=post_id,
+                    author_id=author_id,
+                    created=row["created"],
+                    updated=row["updated"],
+                    text=row["text"],
+                )
+            )
+        fields = (
+            Comment._meta.get_field("created"),
+            Comment._meta.get_field("updated"),
+        )
+        with manual_dates(*fields):
+            Comment.objects.bulk_create(comments)
+        return len(comments)
+
+    def create_follows(self, rows):
+        users = self.ids(
+            User,
+            "username",
+            [row["user"] for row in rows] + [row["author"] for row in rows],
+        )
+        existing = set(
+            Follow.objects.filter(user_id__in=users.values()).values_list(
+                "user_id", "author_id"
+            )
+        )
+        follows = []
+        for row in rows:
+            pair = (users[row["user"]], users[row["author"]])
+            if pair in existing:
+                continue
+            existing.add(pair)
+            follows.append(
+                Follow(
+                    user_id=pair[0],
+                    author_id=pair[1],
+                    updated=parse_datetime(row["updated"]),
+                )
+            )
+        with manual_dates(Follow._meta.get_field("updated")):
+            Follow.objects.bulk_create(follows)
+        return len(follows)
@@ -0,0 +1,160 @@
+import base64
+import binascii
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+
+
+class CursorPage:
+    """A page of a keyset-paginated feed.
+
+    Mirrors the parts of ``django.core.paginator.Page`` the templates use,
+    but instead of page numbers it exposes opaque cursors pointing at the
+    first and last item of the page.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+        # Cursors are taken from the rows the page was cut from, so callers
+        # may swap object_list for hydrated objects afterwards.
+        self.next_cursor = None
+        self.previous_cursor = None
+        if object_list and has_next:
+            self.next_cursor = paginator.encode_cursor(object_list[-1])
+        if object_list and has_previous:
+            self.previous_cursor = paginator.encode_cursor(object_list[0])
+
+    def __repr__(self):
+        return f"<CursorPage of {len(self.object_list)} items>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Seek-based paginator over a ``(datetime, id)`` key, newest first.
+
+    ``after`` returns the items older than the cursor and ``before`` the
+    items newer than it, so every page is a single indexed range scan with
+    no ``COUNT(*)`` and no ``OFFSET``. With ``ascending=True`` the order and
+    the meaning of both cursors are flipped: oldest first, ``after`` newer.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, per_page, keys=("pub_date", "pk"), ascending=False):
+        self.object_list = object_list
+        self.per_page = per_page
+        self.keys = keys
+        self.ascending = ascending
+
+    def encode_cursor(self, obj):
+        # Rows from .values() are dicts; everything else has attributes.
+        if isinstance(obj, dict):
+            moment, pk = (obj[key] for key in self.keys)
+        else:
+            moment, pk = (getattr(obj, key) for key in self.keys)
+        raw = f"{moment.isoformat()}|{pk}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            moment, pk = base64.urlsafe_b64decode(padded).decode().split("|")
+            moment = parse_datetime(moment)
+            pk = int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            return None
+        if moment is None:
+            return None
+        return moment, pk
+
+    def _past(self, cursor, backwards=False):
+        """Items past ``cursor`` in page order, or against it if ``backwards``."""
+        date_key, pk_key = self.keys
+        newer = self.ascending != backwards
+        lookup, sign = ("gt", "") if newer else ("lt", "-")
+        queryset = self.object_list
+        if cursor is not None:
+            moment, pk = cursor
+            queryset = queryset.filter(
+                Q(**{f"{date_key}__{lookup}": moment})
+                | Q(**{date_key: moment, f"{pk_key}__{lookup}": pk})
+            )
+        return queryset.order_by(f"{sign}{date_key}", f"{sign}{pk_key}")
+
+    def seek(self, after=None):
+        """Every item past the ``after`` cursor, in page order."""
+        return self._past(self.decode_cursor(after))
+
+    def get_page(self, after=None, before=None):
+        after = self.decode_cursor(after)
+        before = self.decode_cursor(before) if after is None else None
+
+        if before is not None:
+            queryset = self._past(before, backwards=True)
+            items = list(queryset[: self.per_page + 1])
+            has_previous = len(items) > self.per_page
+            items = items[: self.per_page][::-1]
+            return CursorPage(items, self, has_next=True, has_previous=has_previous)
+
+        items = list(self._past(after)[: self.per_page + 1])
+        has_next = len(items) > self.per_page
+        return CursorPage(
+            items[: self.per_page],
+            self,
+            has_next=has_next,
+            has_previous=after is not None,
+        )
+
+
+def wants_cursor(request):
+    if "after" in request.GET or "before" in request.GET:
+        return True
+    return getattr(settings, "POSTS_PAGINATION", "pages") == "cursor"
+
+
+def paginate(request, object_list, per_page=POSTS_PER_PAGE, keys=("pub_date", "pk")):
+    """Return ``(page, paginator)`` for a feed.
+
+    Page-number pagination stays the default; a request carrying an
+    ``after``/``before`` cursor (or ``POSTS_PAGINATION = "cursor"``)
+    switches the feed to keyset pagination.
+    """
+    if wants_cursor(request):
+        paginator = CursorPaginator(object_list, per_page, keys=keys)
+        page = paginator.get_page(
+            after=request.GET.get("after"), before=request.GET.get("before")
+        )
+        return page, paginator
+
+    paginator = Paginator(object_list, per_page)
+    page = paginator.get_page(request.GET.get("page"))
+    return page, paginator
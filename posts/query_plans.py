@@ -0,0 +1,24 @@
+import re
+
+from django.db import connection
+
+# "SCAN posts_post" is a full table scan; "SCAN ... USING (COVERING) INDEX"
+# walks an index in order and is what a LIMITed feed query should do.
+FULL_SCAN = re.compile(r"^SCAN (?!.*\bUSING\b.*\bINDEX\b)(?!CONSTANT ROW)")
+TEMP_SORT = re.compile(r"USE TEMP B-TREE")
+
+
+def explain(sql):
+    """EXPLAIN QUERY PLAN lines of an SQLite statement."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def problems(sql):
+    """Plan lines showing a full table scan or a temporary sort."""
+    return [
+        line
+        for line in explain(sql)
+        if FULL_SCAN.search(line) or TEMP_SORT.search(line)
+    ]
@@ -0,0 +1,131 @@
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_SESSION_KEY = "_posts_primary_until"
+
+_state = threading.local()
+
+
+def replica_aliases():
+    return list(getattr(settings, "POSTS_REPLICAS", []))
+
+
+def pin_seconds():
+    return getattr(settings, "POSTS_REPLICA_PIN_SECONDS", 60)
+
+
+def lag():
+    """Seconds a replica may be behind the primary."""
+    return getattr(settings, "POSTS_REPLICA_LAG", 30)
+
+
+def reset():
+    _state.replica = None
+    _state.wrote = False
+
+
+def wrote():
+    """Whether this thread has written to the primary since ``reset()``."""
+    return getattr(_state, "wrote", False)
+
+
+def reading():
+    """Whether this thread's reads go to a replica right now."""
+    return getattr(_state, "replica", None) is not None and not wrote()
+
+
+@contextmanager
+def replica():
+    """Send the reads made inside to a randomly chosen replica."""
+    aliases = replica_aliases()
+    previous = getattr(_state, "replica", None)
+    _state.replica = random.choice(aliases) if aliases else None
+    try:
+        yield _state.replica
+    finally:
+        _state.replica = previous
+
+
+def pin(request):
+    """Keep the session's reads on the primary until replicas catch up."""
+    request.session[PIN_SESSION_KEY] = time.time() + pin_seconds()
+
+
+def pinned(request):
+    session = getattr(request, "session", None)
+    return session is not None and session.get(PIN_SESSION_KEY, 0) > time.time()
+
+
+def read_replica(view):
+    """Serve a read view from a replica.
+
+    Requests that are not GET or HEAD, and sessions that wrote something
+    recently, stay on the primary so users always see their own writes.
+    """
+
+    @wraps(view)
+    def inner(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or pinned(request):
+            return view(request, *args, **kwargs)
+        with replica():
+            return view(request, *args, **kwargs)
+
+    return inner
+
+
+class ReplicaRouter:
+    """Routes reads inside ``replica()`` to a replica, everything else to
+    the primary.
+
+    Once a thread writes, its later reads go to the primary too, until
+    the next request resets the state.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = getattr(_state, "replica", None)
+        if alias is not None and not wrote():
+            return alias
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are copies of the primary, schema included.
+        if db in replica_aliases():
+            return False
+        return None
+
+
+def refresh(alias):
+    """Copy the primary database over the SQLite replica ``alias``."""
+    copy_primary(settings.DATABASES[alias]["NAME"])
+
+
+def copy_primary(path):
+    """Copy the primary database into the SQLite file at ``path``.
+
+    Uses SQLite's online backup, so the primary stays writable and readers
+    of the copy see either the old or the new data.
+    """
+    source = connections[DEFAULT_DB_ALIAS]
+    source.ensure_connection()
+    target = sqlite3.connect(path)
+    try:
+        source.connection.backup(target)
+    finally:
+        target.close()
@@ -0,0 +1,114 @@
+import base64
+import binascii
+import re
+
+from django.db import connection
+
+from .feeds import feed_queryset
+from .pagination import POSTS_PER_PAGE, CursorPage
+
+TABLE = "posts_post_fts"
+
+# External-content FTS5 index over posts_post.text, kept in sync by triggers.
+# Everything uses IF NOT EXISTS so install() can run after every migrate:
+# SQLite migrations rebuild posts_post on schema changes, dropping triggers.
+SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE}
+        USING fts5(text, content='posts_post', content_rowid='id')""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_insert AFTER INSERT ON posts_post
+        BEGIN
+            INSERT INTO {TABLE}(rowid, text) VALUES (new.id, new.text);
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_delete AFTER DELETE ON posts_post
+        BEGIN
+            INSERT INTO {TABLE}({TABLE}, rowid, text)
+            VALUES ('delete', old.id, old.text);
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {TABLE}_update AFTER UPDATE OF text
+        ON posts_post
+        BEGIN
+            INSERT INTO {TABLE}({TABLE}, rowid, text)
+            VALUES ('delete', old.id, old.text);
+            INSERT INTO {TABLE}(rowid, text) VALUES (new.id, new.text);
+        END""",
+]
+
+WORD = re.compile(r"\w+")
+
+
+def available(using=connection):
+    return using.vendor == "sqlite"
+
+
+def install(using=connection):
+    if not available(using):
+        return
+    with using.cursor() as cursor:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+
+
+def rebuild(using=connection):
+    """Recreate the index from the posts table."""
+    install(using)
+    with using.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('rebuild')")
+
+
+def to_match(query):
+    """Turn user input into an FTS5 query matching all of its words."""
+    return " ".join(f'"{word}"' for word in WORD.findall(query.lower()))
+
+
+class SearchPaginator:
+    """Cursor pagination over FTS5 results ordered by bm25 rank."""
+
+    is_cursor = True
+
+    def __init__(self, query, per_page=POSTS_PER_PAGE):
+        self.match = to_match(query)
+        self.per_page = per_page
+
+    def encode_cursor(self, row):
+        pk, rank = row
+        raw = f"{rank!r}|{pk}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            rank, pk = base64.urlsafe_b64decode(padded).decode().split("|")
+            return float(rank), int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            return None
+
+    def get_page(self, after=None):
+        after = self.decode_cursor(after)
+        if not self.match:
+            return CursorPage([], self, has_next=False, has_previous=False)
+
+        sql = f"SELECT rowid, rank FROM {TABLE} WHERE {TABLE} MATCH %s"
+        params = [self.match]
+        if after is not None:
+            rank, pk = after
+            sql += " AND (rank > %s OR (rank = %s AND rowid > %s))"
+            params += [rank, rank, pk]
+        sql += " ORDER BY rank, rowid LIMIT %s"
+        params.append(self.per_page + 1)
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        page = CursorPage(
+            rows[: self.per_page],
+            self,
+            has_next=len(rows) > self.per_page,
+            has_previous=after is not None,
+        )
+        post_ids = [pk for pk, rank in page.object_list]
+        posts = feed_queryset().in_bulk(post_ids)
+        page.object_list = [posts[pk] for pk in post_ids if pk in posts]
+        return page
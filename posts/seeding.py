@@ -0,0 +1,188 @@
+import contextlib
+import datetime as dt
+import io
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from . import counters, directory, timeline, trending
+from .models import Comment, Follow, Group, Post, User
+
+# SQLite caps a multi-row INSERT at 500 rows.
+BATCH_SIZE = 500
+WORDS = (
+    "кот собака утро город море книга кофе дождь лето зима работа дом друг "
+    "музыка фильм дорога солнце вечер поезд река лес небо окно чай город"
+).split()
+
+
+@contextlib.contextmanager
+def manual_dates(*fields):
+    """Let bulk_create keep explicit values of auto_now(_add) fields."""
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Seeder:
+    """Bulk-generates a realistic data set.
+
+    Activity is skewed the way social sites are: author, follow and comment
+    targets are drawn from a Zipf-like distribution, so a few users write
+    most posts and attract most followers.
+    """
+
+    def __init__(self, prefix="seed", skew=1.1, days=365, seed=None, log=None):
+        self.prefix = prefix
+        self.skew = skew
+        self.days = days
+        self.random = random.Random(seed)
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+
+    def weights(self, count):
+        return [1 / (rank**self.skew) for rank in range(1, count + 1)]
+
+    def pick(self, items, weights, k):
+        return self.random.choices(items, weights=weights, k=k)
+
+    def moment(self, not_before=None):
+        start = not_before or self.now - dt.timedelta(days=self.days)
+        span = (self.now - start).total_seconds()
+        return start + dt.timedelta(seconds=self.random.random() * span)
+
+    def text(self, low=3, high=40):
+        return " ".join(self.random.choices(WORDS, k=self.random.randint(low, high)))
+
+    def image(self, index):
+        buffer = io.BytesIO()
+        color = tuple(self.random.randrange(256) for _ in range(3))
+        Image.new("RGB", (1280, 960), color).save(buffer, "JPEG", quality=80)
+        name = f"posts/{self.prefix}_{index}.jpg"
+        return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+    def run(self, users, groups, posts, follows, comments, images=0.0):
+        with transaction.atomic():
+            user_ids = self.create_users(users)
+            group_ids = self.create_groups(groups)
+            post_rows = self.create_posts(posts, user_ids, group_ids, images)
+            self.create_follows(follows, user_ids)
+            self.create_comments(comments, user_ids, post_rows)
+
+            self.log("Rebuilding timelines, counters, trending scores and group stats")
+            timeline.rebuild()
+            counters.repair()
+            trending.rebuild()
+            directory.rebuild()
+        cache.clear()
+
+    def create_users(self, count):
+        self.log(f"Creating {count} users")
+        password = make_password(self.prefix)
+        start = User.objects.count()
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f"{self.prefix}_user_{start + i}",
+                    first_name=self.random.choice(WORDS).title(),
+                    password=password,
+                )
+                for i in range(count)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        users = User.objects.filter(username__startswith=f"{self.prefix}_user_")
+        return list(users.order_by("pk").values_list("pk", flat=True))
+
+    def create_groups(self, count):
+        self.log(f"Creating {count} groups")
+        start = Group.objects.count()
+        Group.objects.bulk_create(
+            [
+                Group(
+                    title=f"{self.random.choice(WORDS).title()} {start + i}",
+                    slug=f"{self.prefix}-group-{start + i}",
+                    description=self.text(),
+                )
+                for i in range(count)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        groups = Group.objects.filter(slug__startswith=f"{self.prefix}-group-")
+        return list(groups.values_list("pk", flat=True))
+
+    def create_posts(self, count, user_ids, group_ids, images):
+        self.log(f"Creating {count} posts")
+        authors = self.pick(user_ids, self.weights(len(user_ids)), count)
+        group_weights = self.weights(len(group_ids))
+        batch = []
+        with manual_dates(Post._meta.get_field("pub_date")):
+            for i, author_id in enumerate(authors):
+                group_id = None
+                if group_ids and self.random.random() < 0.7:
+                    group_id = self.pick(group_ids, group_weights, 1)[0]
+                image = self.image(i) if self.random.random() < images else ""
+                batch.append(
+                    Post(
+                        text=self.text(),
+                        author_id=author_id,
+                        group_id=group_id,
+                        image=image,
+                        pub_date=self.moment(),
+                    )
+                )
+                if len(batch) >= BATCH_SIZE:
+                    Post.objects.bulk_create(batch)
+                    batch = []
+            Post.objects.bulk_create(batch)
+        posts = Post.objects.filter(author__username__startswith=f"{self.prefix}_user_")
+        return list(posts.order_by("pk").values_list("pk", "pub_date"))
+
+    def create_follows(self, count, user_ids):
+        self.log(f"Creating up to {count} follows")
+        weights = self.weights(len(user_ids))
+        pairs = set()
+        attempts = 0
+        while len(pairs) < count and attempts < count * 10:
+            attempts += 1
+            user_id = self.random.choice(user_ids)
+            author_id = self.pick(user_ids, weights, 1)[0]
+            if user_id != author_id:
+                pairs.add((user_id, author_id))
+        Follow.objects.bulk_create(
+            [Follow(user_id=u, author_id=a) for u, a in pairs],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+
+    def create_comments(self, count, user_ids, post_rows):
+        self.log(f"Creating {count} comments")
+        if not post_rows:
+            return
+        targets = self.pick(post_rows, self.weights(len(post_rows)), count)
+        batch = []
+        with manual_dates(Comment._meta.get_field("created")):
+            for post_id, pub_date in targets:
+                batch.append(
+                    Comment(
+                        post_id=post_id,
+                        author_id=self.random.choice(user_ids),
+                        text=self.text(1, 15),
+                        created=self.moment(not_before=pub_date),
+                    )
+                )
+                if len(batch) >= BATCH_SIZE:
+                    Comment.objects.bulk_create(batch)
+                    batch = []
+            Comment.objects.bulk_create(batch)
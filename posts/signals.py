@@ -0,0 +1,109 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from . import (
+    caching,
+    counters,
+    directory,
+    follow_graph,
+    suggestions,
+    timeline,
+    trending,
+)
+from .models import Comment, Follow, Group, Post, User, UserStats
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_init, sender=Post)
+def post_loaded(sender, instance, **kwargs):
+    # Read the raw values: touching a deferred field here would reload it.
+    instance._original_group_id = instance.__dict__.get("group_id")
+    image = instance.__dict__.get("image")
+    instance._original_image = getattr(image, "name", image)
+
+
+@receiver(pre_save, sender=Post)
+def post_saving(sender, instance, raw=False, **kwargs):
+    if not raw and instance._state.adding:
+        instance.trend_score = trending.initial_score(instance)
+    if not raw and instance._original_image != instance.image.name:
+        # A new upload has to be normalized and resized by the worker.
+        instance.thumbnails_ready = False
+        instance.thumbnails = ""
+        instance.image_width = instance.image_height = instance.image_size = None
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_group_id = None
+    if created:
+        counters.post_created(instance)
+        timeline.fan_out(instance)
+        directory.post_moved(instance, None, instance.group_id)
+        suggestions.post_moved(instance, None, instance.group_id)
+    elif instance._original_group_id != instance.group_id:
+        old_group_id = instance._original_group_id
+        counters.post_moved(old_group_id, instance.group_id)
+        directory.post_moved(instance, old_group_id, instance.group_id)
+        suggestions.post_moved(instance, old_group_id, instance.group_id)
+    caching.invalidate_post(instance, old_group_id)
+    instance._original_group_id = instance.group_id
+    instance._original_image = instance.image.name
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.post_deleted(instance)
+    directory.post_moved(instance, instance.group_id, None)
+    suggestions.post_moved(instance, instance.group_id, None)
+    caching.invalidate_post(instance)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.comment_created(instance)
+        trending.comment_added(instance)
+    if not raw:
+        caching.invalidate_post(instance.post)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.comment_deleted(instance)
+    caching.invalidate_post(instance.post)
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.follow_created(instance)
+        timeline.add_author(instance.user_id, instance.author_id)
+        caching.invalidate_follow(instance)
+        follow_graph.forget([instance.user_id], [instance.author_id])
+        suggestions.follows_changed(instance.user_id, [instance.author_id])
+        trending.author_followed([instance.author_id], instance.updated)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.follow_deleted(instance)
+    timeline.remove_author(instance.user_id, instance.author_id)
+    caching.invalidate_follow(instance)
+    follow_graph.forget([instance.user_id], [instance.author_id])
+    suggestions.follows_changed(instance.user_id)
+    trending.author_unfollowed([instance.author_id], instance.updated)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        caching.invalidate_group(instance)
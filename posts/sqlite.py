@@ -0,0 +1,188 @@
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection as default_connection
+from django.utils import timezone
+
+from .models import Comment, Post, User
+
+# PRAGMA name -> value, per POSTS_SQLITE_PROFILE.
+PROFILES = {
+    "development": {},
+    "production": {
+        # Readers keep reading the last committed state while one writer
+        # appends to the log, instead of locking each other out.
+        "journal_mode": "wal",
+        # With WAL, fsync on checkpoints only; a crash can lose the last
+        # transactions but never corrupts the database.
+        "synchronous": "normal",
+        # Wait for a lock instead of failing with "database is locked".
+        "busy_timeout": 5000,
+        # Negative: size in KiB, i.e. a 64 MB page cache per connection.
+        "cache_size": -64000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "memory",
+    },
+}
+
+
+def pragmas(profile=None):
+    profile = profile or getattr(settings, "POSTS_SQLITE_PROFILE", "development")
+    return PROFILES[profile]
+
+
+def apply_pragmas(cursor, values):
+    for name, value in values.items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def configure(sender, connection, **kwargs):
+    """``connection_created`` hook applying the profile's pragmas."""
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            apply_pragmas(cursor, pragmas())
+
+
+class Benchmark:
+    """Concurrent feed reads and comment writes against a database copy.
+
+    Runs the same workload in two modes: ``baseline`` opens a connection
+    per operation with SQLite's defaults, like the stock settings do per
+    request; ``production`` keeps one connection per thread with the
+    production pragmas. Every mode gets its own fresh copy of the
+    database, so the real one is never written to.
+    """
+
+    MODES = {
+        "baseline": ("development", False),
+        "production": ("production", True),
+    }
+
+    def __init__(self, seconds=5.0, readers=4, writers=1):
+        self.seconds = seconds
+        self.readers = readers
+        self.writers = writers
+        posts = Post.objects.select_related("author", "group")[:10]
+        sql, params = posts.query.sql_with_params()
+        # The ORM writes %s placeholders; the sqlite3 module wants ?.
+        self.feed_sql = sql.replace("%s", "?"), params
+        self.post_ids = list(Post.objects.values_list("pk", flat=True)[:1000])
+        self.user_ids = list(User.objects.values_list("pk", flat=True)[:1000])
+
+    def run(self, modes=None):
+        if not self.post_ids or not self.user_ids:
+            return {}
+        directory = tempfile.mkdtemp(prefix="yatube-bench-")
+        try:
+            return {
+                mode: self.run_mode(mode, os.path.join(directory, f"{mode}.sqlite3"))
+                for mode in modes or self.MODES
+            }
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def copy_database(self, path):
+        default_connection.ensure_connection()
+        target = sqlite3.connect(path)
+        try:
+            default_connection.connection.backup(target)
+        finally:
+            target.close()
+
+    def run_mode(self, mode, path):
+        profile, persistent = self.MODES[mode]
+        self.copy_database(path)
+        setup = sqlite3.connect(path)
+        apply_pragmas(setup, pragmas(profile))
+        setup.close()
+
+        stats = {"reads": 0, "writes": 0, "errors": 0, "busy_time": 0.0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + self.seconds
+
+        def work(operation):
+            local = None
+            counts = {"reads": 0, "writes": 0, "errors": 0, "busy_time": 0.0}
+            try:
+                while time.monotonic() < deadline:
+                    db = local or self.connect(path, profile)
+                    if persistent:
+                        local = db
+                    started = time.perf_counter()
+                    try:
+                        counts[operation(db)] += 1
+                    except sqlite3.OperationalError:
+                        counts["errors"] += 1
+                    counts["busy_time"] += time.perf_counter() - started
+                    if not persistent:
+                        db.close()
+            finally:
+                if local is not None:
+                    local.close()
+                with lock:
+                    for name, value in counts.items():
+                        stats[name] += value
+
+        threads = [
+            threading.Thread(target=work, args=(self.read,))
+            for _ in range(self.readers)
+        ] + [
+            threading.Thread(target=work, args=(self.write,))
+            for _ in range(self.writers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        operations = stats["reads"] + stats["writes"]
+        return {
+            "reads_per_second": stats["reads"] / self.seconds,
+            "writes_per_second": stats["writes"] / self.seconds,
+            "errors": stats["errors"],
+            "mean_latency_ms": (
+                stats["busy_time"] / operations * 1000 if operations else None
+            ),
+        }
+
+    def connect(self, path, profile):
+        db = sqlite3.connect(path, isolation_level=None)
+        apply_pragmas(db, pragmas(profile))
+        return db
+
+    def read(self, db):
+        sql, params = self.feed_sql
+        db.execute(sql, params).fetchall()
+        db.execute(
+            f"SELECT * FROM {Comment._meta.db_table} WHERE post_id = ? "
+            "ORDER BY created DESC LIMIT 20",
+            [random.choice(self.post_ids)],
+        ).fetchall()
+        return "reads"
+
+    def write(self, db):
+        post_id = random.choice(self.post_ids)
+        now = default_connection.ops.adapt_datetimefield_value(timezone.now())
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                f"INSERT INTO {Comment._meta.db_table} "
+                "(post_id, author_id, text, created, updated) VALUES (?, ?, ?, ?, ?)",
+                [post_id, random.choice(self.user_ids), "benchmark", now, now],
+            )
+            db.execute(
+                f"UPDATE {Post._meta.db_table} "
+                "SET comments_count = comments_count + 1, updated = ? WHERE id = ?",
+                [now, post_id],
+            )
+        except sqlite3.Error:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        return "writes"
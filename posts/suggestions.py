@@ -0,0 +1,131 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from . import caching
+from .models import Follow, FollowSuggestion, Post, UserStats
+
+# Suggestions kept per user, and how many of them the pages show.
+MAX_SUGGESTIONS = 20
+SHOWN = 5
+
+# Score of a candidate per path to it through a followed author, and per
+# group both the user and the candidate have posted in.
+TWO_HOP_WEIGHT = 1.0
+GROUP_WEIGHT = 0.5
+
+
+def candidates(user_id):
+    """Best ``(author_id, score)`` suggestions for a user, highest first.
+
+    Walks two hops of the follow graph and the authors posting in the
+    user's groups, in two aggregate queries. Authors the user already
+    follows and the user themself are left out.
+    """
+    followed = Follow.objects.filter(user_id=user_id).values("author_id")
+    scores = defaultdict(float)
+
+    two_hop = (
+        Follow.objects.filter(user_id__in=followed)
+        .exclude(author_id__in=followed)
+        .exclude(author_id=user_id)
+        .values("author_id")
+        .annotate(paths=Count("pk"))
+    )
+    for row in two_hop:
+        scores[row["author_id"]] += TWO_HOP_WEIGHT * row["paths"]
+
+    groups = Post.objects.filter(author_id=user_id, group__isnull=False)
+    co_posting = (
+        Post.objects.filter(group_id__in=groups.order_by().values("group_id"))
+        .exclude(author_id__in=followed)
+        .exclude(author_id=user_id)
+        .order_by()
+        .values("author_id")
+        .annotate(groups=Count("group_id", distinct=True))
+    )
+    for row in co_posting:
+        scores[row["author_id"]] += GROUP_WEIGHT * row["groups"]
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    return ranked[:MAX_SUGGESTIONS]
+
+
+def _invalidate(user_ids):
+    # Pages showing suggestions vary on the viewer's scope.
+    caching.bump(*(caching.scope("viewer", pk) for pk in user_ids))
+
+
+@transaction.atomic
+def refresh(user_id):
+    """Recompute and store the suggestions of one user."""
+    # Cleared first: a follow made while this runs marks the user again.
+    UserStats.objects.filter(user_id=user_id).update(suggestions_stale=False)
+    FollowSuggestion.objects.filter(user_id=user_id).delete()
+    FollowSuggestion.objects.bulk_create(
+        FollowSuggestion(user_id=user_id, author_id=author_id, score=score)
+        for author_id, score in candidates(user_id)
+    )
+    _invalidate([user_id])
+
+
+def stale(limit):
+    return list(
+        UserStats.objects.filter(suggestions_stale=True)
+        .order_by("user_id")
+        .values_list("user_id", flat=True)[:limit]
+    )
+
+
+def follows_changed(user_id, author_ids=()):
+    """Note that ``user_id`` (un)followed ``author_ids``.
+
+    Newly followed authors leave the user's suggestions at once. The
+    user, and everyone reaching new authors through them, are queued for
+    the worker to recompute.
+    """
+    if author_ids:
+        FollowSuggestion.objects.filter(
+            user_id=user_id, author_id__in=author_ids
+        ).delete()
+        _invalidate([user_id])
+    followers = Follow.objects.filter(author_id=user_id).values("user_id")
+    UserStats.objects.filter(Q(user_id=user_id) | Q(user_id__in=followers)).update(
+        suggestions_stale=True
+    )
+
+
+def post_moved(post, old_group_id, new_group_id):
+    """Note that ``post`` entered ``new_group_id`` and left ``old_group_id``.
+
+    A new post moves in from no group and a deleted one out to none. When
+    the author starts or stops posting in a group, the author and the
+    group's other posters are queued for the worker to recompute.
+    """
+    others = Post.objects.filter(author_id=post.author_id).exclude(pk=post.pk)
+    groups = [
+        group_id
+        for group_id in (old_group_id, new_group_id)
+        if group_id is not None and not others.filter(group_id=group_id).exists()
+    ]
+    if not groups:
+        return
+    co_posters = Post.objects.filter(group_id__in=groups).values("author_id")
+    UserStats.objects.filter(
+        Q(user_id=post.author_id) | Q(user_id__in=co_posters)
+    ).update(suggestions_stale=True)
+
+
+def for_user(user, exclude=None, limit=SHOWN):
+    """Suggestions to show a reader, in one indexed query."""
+    if not user.is_authenticated:
+        return []
+    rows = (
+        FollowSuggestion.objects.filter(user=user)
+        .select_related("author")
+        .order_by("-score", "author_id")
+    )
+    if exclude is not None:
+        rows = rows.exclude(author=exclude)
+    return list(rows[:limit])
@@ -0,0 +1,11 @@
+from django import template
+
+from posts import cards
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    """Cached card of a post, with the edit button for its author."""
+    return cards.card_html(post, context.get("user"))
@@ -0,0 +1,11 @@
+from django import template
+
+from posts import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_thumbnail(post, size="card"):
+    """Pre-generated thumbnail of a post image, or None while it is not ready."""
+    return thumbnails.lookup(post, size)
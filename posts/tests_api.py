@@ -0,0 +1,90 @@
+import json
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Comment, Follow, Group, Post, User
+
+
+class TestsOfApi(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author")
+        self.reader = User.objects.create_user(username="reader")
+        self.group = Group.objects.create(title="Кошки", slug="cats", description="-")
+        self.client = Client()
+
+    def fetch(self, url, **params):
+        response = self.client.get(url, params)
+        body = b"".join(response.streaming_content) if response.streaming else None
+        return response, json.loads(body if body is not None else response.content)
+
+    def walk(self, url, **params):
+        ids, after = [], None
+        while True:
+            if after:
+                params["after"] = after
+            response, data = self.fetch(url, **params)
+            ids.extend(item["id"] for item in data["results"])
+            after = data["next_cursor"]
+            if after is None:
+                return ids
+
+    def test_feeds_are_paginated_with_cursors(self):
+        """Tests that the feeds list every post once,
+        newest first, page after page"""
+
+        posts = [
+            Post.objects.create(text=f"Пост {i}", author=self.author, group=self.group)
+            for i in range(7)
+        ]
+        expected = [post.pk for post in reversed(posts)]
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client.force_login(self.reader)
+
+        urls = [
+            reverse("api_index"),
+            reverse("api_group", kwargs={"slug": "cats"}),
+            reverse("api_profile", kwargs={"username": "author"}),
+            reverse("api_follow"),
+        ]
+        for url in urls:
+            self.assertEqual(self.walk(url, limit=3), expected, url)
+
+        response, data = self.fetch(reverse("api_index"), limit=2)
+        self.assertTrue(response.streaming)
+        self.assertEqual(data["results"][0]["text"], "Пост 6")
+        self.assertEqual(data["results"][0]["author"], "author")
+        self.assertEqual(data["results"][0]["group"], "cats")
+
+    def test_one_query_per_page(self):
+        """Tests that a page is read with a single query"""
+
+        for i in range(3):
+            Post.objects.create(text=f"Пост {i}", author=self.author, group=self.group)
+        with CaptureQueriesContext(connection) as queries:
+            self.fetch(reverse("api_index"))
+        self.assertEqual(len(queries), 1)
+
+    def test_post_and_comments(self):
+        """Tests the post detail and comment list
+        endpoints and their errors"""
+
+        post = Post.objects.create(text="Пост", author=self.author)
+        for i in range(3):
+            Comment.objects.create(post=post, author=self.reader, text=f"Отзыв {i}")
+
+        response, data = self.fetch(reverse("api_post", kwargs={"post_id": post.pk}))
+        self.assertEqual(data["text"], "Пост")
+        self.assertEqual(data["comments_count"], 3)
+
+        url = reverse("api_comments", kwargs={"post_id": post.pk})
+        self.assertEqual(len(self.walk(url, limit=2)), 3)
+
+        response, data = self.fetch(reverse("api_post", kwargs={"post_id": 999}))
+        self.assertEqual(response.status_code, 404)
+        response, data = self.fetch(reverse("api_follow"))
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,46 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from .models import Post, User, Follow, Comment
+
+
+class TestsOfFeedCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author")
+        self.reader = User.objects.create_user(username="reader")
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_pages_and_feeds_have_own_keys(self):
+        """Tests that page 2 of the index and the follow
+        feed are not served from the index page 1 fragment"""
+
+        for i in range(11):
+            Post.objects.create(text=f"post number {i}", author=self.author)
+
+        first = self.client.get(reverse("index"))
+        second = self.client.get(reverse("index"), {"page": 2})
+        follow = self.client.get(reverse("follow_index"))
+
+        self.assertContains(first, "post number 10")
+        self.assertNotContains(second, "post number 10")
+        self.assertContains(second, "post number 0")
+        self.assertNotContains(follow, "post number")
+
+    def test_writes_invalidate_cached_feeds(self):
+        """Tests that new posts, comments and follows
+        show up in cached feeds immediately"""
+
+        post = Post.objects.create(text="first post", author=self.author)
+        self.client.get(reverse("index"))
+        self.client.get(reverse("follow_index"))
+
+        Post.objects.create(text="second post", author=self.author)
+        self.assertContains(self.client.get(reverse("index")), "second post")
+
+        Comment.objects.create(post=post, author=self.reader, text="c")
+        self.assertContains(self.client.get(reverse("index")), "1 комментариев")
+
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertContains(self.client.get(reverse("follow_index")), "second post")
@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from . import cards
+from .models import Post, User
+
+
+class TestsOfPostCards(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author")
+        self.reader = User.objects.create_user(username="reader")
+        for i in range(3):
+            self.post = Post.objects.create(text=f"Пост {i}", author=self.author)
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def cards_rendered(self, response):
+        return [t.name for t in response.templates].count("includes/post_card.html")
+
+    def test_pages_reuse_cached_cards(self):
+        """Tests that a feed re-rendered after a new post renders
+        only the new card and that edits show up at once"""
+
+        self.assertEqual(self.cards_rendered(self.client.get(reverse("index"))), 3)
+        Post.objects.create(text="Новый пост", author=self.reader)
+        self.assertEqual(self.cards_rendered(self.client.get(reverse("index"))), 1)
+
+        self.client.post(
+            reverse(
+                "post_edit", kwargs={"username": "author", "post_id": self.post.pk}
+            ),
+            {"text": "Исправленный пост"},
+        )
+        response = self.client.get(reverse("index"))
+        self.assertEqual(self.cards_rendered(response), 1)
+        self.assertContains(response, "Исправленный пост")
+
+    def test_edit_button_is_per_viewer(self):
+        """Tests that only the author gets the edit button
+        on a card the reader gets from the same cache entry"""
+
+        edit_url = reverse(
+            "post_edit", kwargs={"username": "author", "post_id": self.post.pk}
+        )
+        url = reverse("post", kwargs={"username": "author", "post_id": self.post.pk})
+        self.assertContains(self.client.get(url), edit_url)
+
+        self.client.force_login(self.reader)
+        response = self.client.get(url)
+        self.assertEqual(self.cards_rendered(response), 0)
+        self.assertNotContains(response, edit_url)
+
+    def test_benchmark_renders_the_edit_button_in_every_mode(self):
+        """Tests that benchmark_cards times the old and the cached card
+        of post_item.html with the viewer's edit button in both"""
+
+        edit_url = reverse(
+            "post_edit", kwargs={"username": "author", "post_id": self.post.pk}
+        )
+        for name in (cards.BASELINE_TEMPLATE, cards.ITEM_TEMPLATE):
+            html = get_template(name).render({"post": self.post, "user": self.author})
+            self.assertIn(edit_url, html)
+
+        report = cards.benchmark(Post.objects.all(), viewer=self.author, rounds=1)
+        self.assertEqual(set(report), {"baseline", "card_cache", "card_cache_cold"})
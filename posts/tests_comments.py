@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Comment, Post, User
+from .pagination import COMMENTS_PER_PAGE
+
+
+class TestsOfCommentPages(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author")
+        self.post = Post.objects.create(text="Пост", author=self.author)
+        self.kwargs = {"username": "author", "post_id": self.post.pk}
+        self.client = Client()
+
+    def comment(self, count):
+        start = Comment.objects.count()
+        for i in range(start, start + count):
+            reader = User.objects.create_user(username=f"reader{i}")
+            Comment.objects.create(post=self.post, author=reader, text=f"Отзыв {i}")
+
+    def queries(self, url, params=None):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_first_paint_does_not_grow_with_comments(self):
+        """Tests that the post page costs the same queries
+        with a few comments and with many"""
+
+        url = reverse("post", kwargs=self.kwargs)
+        self.comment(COMMENTS_PER_PAGE + 1)
+        few = self.queries(url)
+        self.comment(COMMENTS_PER_PAGE * 5)
+        many = self.queries(url)
+        self.assertEqual(few, many)
+
+    def test_load_more_walks_all_comments(self):
+        """Tests that the fragment endpoint returns
+        the following comments, oldest first"""
+
+        self.comment(COMMENTS_PER_PAGE + 5)
+        response = self.client.get(reverse("post", kwargs=self.kwargs))
+        page = response.context["comments"]
+        self.assertEqual(len(page), COMMENTS_PER_PAGE)
+        self.assertEqual(page[0].text, "Отзыв 0")
+        self.assertContains(response, "Показать ещё")
+
+        fragment = self.client.get(
+            reverse("post_comments", kwargs=self.kwargs),
+            {"after": response.context["comments_next"]},
+        )
+        texts = [comment.text for comment in fragment.context["comments"]]
+        expected = [
+            f"Отзыв {i}" for i in range(COMMENTS_PER_PAGE, COMMENTS_PER_PAGE + 5)
+        ]
+        self.assertEqual(texts, expected)
+        self.assertNotContains(fragment, "Показать ещё")
+        self.assertNotContains(fragment, "<html")
@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Comment, Follow, Group, Post, User
+
+
+class TestsOfConditionalGet(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author")
+        self.reader = User.objects.create_user(username="reader")
+        self.group = Group.objects.create(title="Кошки", slug="cats", description="-")
+        self.post = Post.objects.create(
+            text="Текст поста", author=self.author, group=self.group
+        )
+        self.client = Client()
+        self.urls = [
+            reverse("index"),
+            reverse("group", kwargs={"slug": "cats"}),
+            reverse("profile", kwargs={"username": "author"}),
+            reverse("post", kwargs={"username": "author", "post_id": self.post.pk}),
+        ]
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_unchanged_pages_answer_304_without_rendering(self):
+        """Tests that read views answer a matching
+        If-None-Match with 304 before rendering"""
+
+        self.client.force_login(self.reader)
+        for url in self.urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("Last-Modified", response)
+
+            with CaptureQueriesContext(connection) as queries:
+                again = self.revalidate(url, response)
+            self.assertEqual(again.status_code, 304, url)
+            # The session, the user and the one validator query.
+            self.assertEqual(len(queries), 3, url)
+            self.assertFalse(again.templates)
+
+            since = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+            )
+            self.assertEqual(since.status_code, 304, url)
+
+    def test_changes_invalidate_validators(self):
+        """Tests that edits, comments, follows and deletions
+        change the validators of the pages showing them"""
+
+        changes = [
+            lambda: Post.objects.filter(pk=self.post.pk).get().save(),
+            lambda: Comment.objects.create(
+                post=self.post, author=self.reader, text="Комментарий"
+            ),
+            lambda: Follow.objects.create(user=self.reader, author=self.author),
+            lambda: Post.objects.create(text="Второй", author=self.author).delete(),
+        ]
+        for change in changes:
+            responses = {url: self.client.get(url) for url in self.urls}
+            change()
+            post_url = self.urls[-1]
+            self.assertEqual(
+                self.revalidate(post_url, responses[post_url]).status_code, 200
+            )
+            profile_url = self.urls[2]
+            self.assertEqual(
+                self.revalidate(profile_url, responses[profile_url]).status_code, 200
+            )
+
+    def test_viewer_is_part_of_the_etag(self):
+        """Tests that a page fetched anonymously is not
+        revalidated for a logged in user"""
+
+        url = self.urls[0]
+        response = self.client.get(url)
+        self.client.force_login(self.reader)
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
@@ -0,0 +1,91 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+from .models import Post, User, Group, Follow, Comment, UserStats
+
+
+class TestsOfCounters(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author")
+        self.reader = User.objects.create_user(username="reader")
+        self.group_1 = Group.objects.create(title="g1", slug="g1", description="g1")
+        self.group_2 = Group.objects.create(title="g2", slug="g2", description="g2")
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def refresh(self, obj):
+        obj.refresh_from_db()
+        return obj
+
+    def test_post_and_comment_counters(self):
+        """Tests that creating, moving and deleting
+        posts and comments keeps counters in sync"""
+
+        post = Post.objects.create(text="t", author=self.author, group=self.group_1)
+        comment = Comment.objects.create(post=post, author=self.reader, text="c")
+
+        self.assertEqual(self.refresh(self.author.stats).posts_count, 1)
+        self.assertEqual(self.refresh(self.group_1).posts_count, 1)
+        self.assertEqual(self.refresh(post).comments_count, 1)
+
+        self.client.post(
+            reverse("post_edit", kwargs={"username": "author", "post_id": post.pk}),
+            {"text": "moved", "group": self.group_2.pk},
+        )
+        self.assertEqual(self.refresh(self.group_1).posts_count, 0)
+        self.assertEqual(self.refresh(self.group_2).posts_count, 1)
+
+        comment.delete()
+        post = self.refresh(post)
+        self.assertEqual(post.comments_count, 0)
+        post.delete()
+        self.assertEqual(self.refresh(self.author.stats).posts_count, 0)
+        self.assertEqual(self.refresh(self.group_2).posts_count, 0)
+
+    def test_follow_counters(self):
+        """Tests that follow and unfollow update
+        followers and following counters"""
+
+        self.client.get(reverse("profile_follow", kwargs={"username": "reader"}))
+        self.assertEqual(self.refresh(self.reader.stats).followers_count, 1)
+        self.assertEqual(self.refresh(self.author.stats).following_count, 1)
+
+        self.client.get(reverse("profile_unfollow", kwargs={"username": "reader"}))
+        self.assertEqual(self.refresh(self.reader.stats).followers_count, 0)
+        self.assertEqual(self.refresh(self.author.stats).following_count, 0)
+
+    def test_profile_reads_counters(self):
+        """Tests that the profile page shows
+        the stored counters"""
+
+        UserStats.objects.filter(user=self.author).update(
+            posts_count=7, followers_count=8, following_count=9
+        )
+        response = self.client.get(reverse("profile", kwargs={"username": "author"}))
+        self.assertEqual(response.context["posts_count"], 7)
+        self.assertEqual(response.context["followers_count"], 8)
+        self.assertEqual(response.context["following_count"], 9)
+
+    def test_repair_command(self):
+        """Tests that drifted counters are
+        reported and repaired"""
+
+        post = Post.objects.create(text="t", author=self.author, group=self.group_1)
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.filter(pk=post.pk).update(comments_count=5)
+        Group.objects.filter(pk=self.group_1.pk).update(posts_count=0)
+        UserStats.objects.filter(user=self.author).delete()
+
+        out = StringIO()
+        call_command("repair_counters", stdout=out)
+
+        self.assertEqual(self.refresh(post).comments_count, 0)
+        self.assertEqual(self.refresh(self.group_1).posts_count, 1)
+        stats = UserStats.objects.get(user=self.author)
+        self.assertEqual((stats.posts_count, stats.followers_count), (1, 1))
+
+        out = StringIO()
+        call_command("repair_counters", "--check", stdout=out)
+        self.assertIn("in sync", out.getvalue())
@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import caching, directory
+from .models import Group, GroupAuthor, Post, User
+
+
+class TestsOfGroupDirectory(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(username="alice")
+        self.bob = User.objects.create_user(username="bob")
+        self.cats = Group.objects.create(title="Кошки", slug="cats", description="-")
+        self.dogs = Group.objects.create(title="Собаки", slug="dogs", description="-")
+        Post.objects.create(text="Кот", author=self.alice, group=self.cats)
+        Post.objects.create(text="Кот", author=self.alice, group=self.cats)
+        self.moved = Post.objects.create(text="Пёс", author=self.bob, group=self.cats)
+        self.client = Client()
+
+    def test_aggregates_follow_moves_and_deletes(self):
+        """Tests that moving and deleting posts keeps the counts,
+        last activity and top authors of both groups right"""
+
+        self.moved.group = self.dogs
+        self.moved.save()
+        cats = Group.objects.get(pk=self.cats.pk)
+        dogs = Group.objects.get(pk=self.dogs.pk)
+        self.assertEqual(
+            cats.last_post_at, cats.groups_posts.latest("pub_date").pub_date
+        )
+        self.assertEqual(dogs.last_post_at, self.moved.pub_date)
+        self.assertEqual(
+            [group.authors for group in directory.groups()],
+            [
+                [{"username": "bob", "posts_count": 1}],
+                [{"username": "alice", "posts_count": 2}],
+            ],
+        )
+
+        self.moved.delete()
+        dogs = Group.objects.get(pk=self.dogs.pk)
+        self.assertIsNone(dogs.last_post_at)
+        self.assertEqual(dogs.top_authors, "")
+        self.assertFalse(GroupAuthor.objects.filter(group=self.dogs).exists())
+
+    def test_posts_without_a_group_keep_the_directory_cached(self):
+        """Tests that adding, editing and deleting posts outside any group
+        leaves the cached group directory alone"""
+
+        scope = caching.scope("groups")
+        token = caching.generations(scope)
+        post = Post.objects.create(text="Без группы", author=self.bob)
+        post.text = "Всё ещё без группы"
+        post.save()
+        post.delete()
+        self.assertEqual(caching.generations(scope), token)
+
+        self.moved.delete()
+        self.assertNotEqual(caching.generations(scope), token)
+
+    def test_rebuild_and_listing(self):
+        """Tests that rebuilding gives the incremental aggregates
+        and that the directory renders in a single query"""
+
+        stored = list(Group.objects.values_list("pk", "last_post_at", "top_authors"))
+        Group.objects.update(last_post_at=None, top_authors="")
+        GroupAuthor.objects.all().delete()
+        self.assertEqual(directory.rebuild(), 2)
+        self.assertEqual(
+            list(Group.objects.values_list("pk", "last_post_at", "top_authors")),
+            stored,
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("groups"))
+        selects = [q for q in queries if "posts_group" in q["sql"]]
+        self.assertEqual(len(selects), 1)
+        self.assertContains(response, "@alice")
+        self.assertContains(response, "Записей: 3")
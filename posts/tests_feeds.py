@@ -0,0 +1,48 @@
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .models import Post, User, Group, Follow, Comment
+
+
+class TestsOfFeedQueries(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author")
+        self.reader = User.objects.create_user(username="reader")
+        self.group = Group.objects.create(title="g", slug="g", description="g")
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def add_posts(self, count):
+        for i in range(count):
+            post = Post.objects.create(
+                text=f"post {i}", author=self.author, group=self.group
+            )
+            Comment.objects.create(post=post, author=self.reader, text="c")
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_feed_queries_do_not_grow_with_page_size(self):
+        """Tests that every feed is rendered in the same
+        number of queries for one post and for a full page"""
+
+        urls = [
+            reverse("index"),
+            reverse("group", kwargs={"slug": "g"}),
+            reverse("profile", kwargs={"username": "author"}),
+            reverse("follow_index"),
+        ]
+        # Warm the per-user caches; adding posts orphans the cached feeds.
+        for url in urls:
+            self.count_queries(url)
+        self.add_posts(1)
+        single = [self.count_queries(url) for url in urls]
+        self.add_posts(9)
+        full = [self.count_queries(url) for url in urls]
+
+        self.assertEqual(single, full)
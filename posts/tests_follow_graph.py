@@ -0,0 +1,87 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from . import counters, follow_graph
+from .models import Follow, Post, TimelineEntry, User
+
+
+class TestsOfFollowGraph(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create_user(username="reader")
+        self.authors = [
+            User.objects.create_user(username=f"author{i}") for i in range(3)
+        ]
+        self.ids = [author.pk for author in self.authors]
+        for author in self.authors:
+            Post.objects.create(text="Текст", author=author)
+
+    def test_bulk_follow_keeps_everything_in_sync(self):
+        """Tests that following many authors at once updates
+        counters and timelines and skips the reader and old follows"""
+
+        Follow.objects.create(user=self.reader, author=self.authors[0])
+        followed = follow_graph.follow(self.reader, self.ids + [self.reader.pk])
+
+        self.assertEqual(followed, set(self.ids[1:]))
+        self.assertEqual(Follow.objects.filter(user=self.reader).count(), 3)
+        self.assertEqual(TimelineEntry.objects.filter(user=self.reader).count(), 3)
+        self.assertEqual(counters.repair(fix=False), [])
+        self.assertEqual(follow_graph.following(self.reader.pk), set(self.ids))
+
+        self.assertEqual(
+            follow_graph.unfollow(self.reader, self.ids[:2]), set(self.ids[:2])
+        )
+        self.assertEqual(follow_graph.following(self.reader.pk), {self.ids[2]})
+        self.assertEqual(follow_graph.followers(self.ids[0]), set())
+        self.assertEqual(counters.repair(fix=False), [])
+
+    def test_lookups_are_cached(self):
+        """Tests that follow checks for a list of authors
+        cost no queries once the reader's set is cached"""
+
+        follow_graph.follow(self.reader, self.ids[:1])
+        follow_graph.following(self.reader.pk)
+        with self.assertNumQueries(0):
+            found = follow_graph.following_among(self.reader.pk, self.ids)
+        self.assertEqual(found, {self.ids[0]})
+        self.assertEqual(follow_graph.following_among(None, self.ids), set())
+
+        Follow.objects.create(user=self.reader, author=self.authors[1])
+        self.assertTrue(follow_graph.is_following(self.reader.pk, self.ids[1]))
+
+    def test_pages_are_ordered_by_username(self):
+        """Tests that followers and followed authors
+        are listed page by page"""
+
+        follow_graph.follow(self.reader, self.ids)
+        page = follow_graph.following_page(self.reader.pk, 2, per_page=2)
+        self.assertEqual([user.username for user in page], ["author2"])
+        page = follow_graph.followers_page(self.ids[0])
+        self.assertEqual([user.username for user in page], ["reader"])
+
+    def test_follow_lists_show_the_viewers_buttons(self):
+        """Tests that a list of followed authors gets its follow
+        buttons from the viewer's cached set"""
+
+        follow_graph.follow(self.reader, self.ids)
+        viewer = User.objects.create_user(username="viewer")
+        follow_graph.follow(viewer, self.ids[:1])
+        client = Client()
+        client.force_login(viewer)
+        url = reverse("profile_following", kwargs={"username": "reader"})
+
+        response = client.get(url)
+        self.assertEqual(response.context["followed"], {self.ids[0]})
+        self.assertContains(
+            response, reverse("profile_unfollow", kwargs={"username": "author0"})
+        )
+        self.assertContains(
+            response, reverse("profile_follow", kwargs={"username": "author2"})
+        )
+        followers = reverse("profile_followers", kwargs={"username": "author0"})
+        self.assertEqual(
+            [user.username for user in client.get(followers).context["page"]],
+            ["reader", "viewer"],
+        )
@@ -0,0 +1,74 @@
+import io
+import json
+import socket
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from . import counters
+from .loadtest import NO_RESPONSE, Harness
+from .models import Comment, Follow, Group, Post, TimelineEntry, User
+
+
+class TestsOfLoadTest(TestCase):
+    def seed(self):
+        call_command(
+            "seed_data",
+            users=20,
+            groups=3,
+            posts=60,
+            follows=40,
+            comments=80,
+            seed=1,
+            stdout=io.StringIO(),
+        )
+
+    def test_seed_data_is_consistent(self):
+        """Tests that seeded rows come with timelines
+        and denormalized counters already in place"""
+
+        self.seed()
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 60)
+        self.assertEqual(Comment.objects.count(), 80)
+        self.assertTrue(Follow.objects.exists())
+        self.assertTrue(TimelineEntry.objects.exists())
+        self.assertEqual(counters.repair(fix=False), [])
+
+    def test_loadtest_reports_every_route(self):
+        """Tests that the load test drives the project routes
+        and writes a machine-readable report"""
+
+        self.seed()
+        output = io.StringIO()
+        call_command(
+            "loadtest",
+            user="seed_user_0",
+            requests=2,
+            concurrency=1,
+            json=True,
+            stdout=output,
+        )
+        report = json.loads(output.getvalue())
+        routes = {item["route"]: item for item in report["routes"]}
+        for name in ("index", "group", "profile", "post", "follow_index", "search"):
+            self.assertEqual(routes[name]["statuses"], [200])
+            self.assertIsNotNone(routes[name]["p95_ms"])
+            self.assertIsNotNone(routes[name]["mean_queries"])
+        self.assertIn("new_post", report["skipped"])
+        self.assertEqual(report["total_requests"], 2 * len(report["routes"]))
+
+    def test_unreachable_server_counts_as_errors(self):
+        """Tests that requests nobody answers are reported
+        as errors instead of aborting the run"""
+
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        harness = Harness(
+            concurrency=2, requests=3, base_url=f"http://127.0.0.1:{port}"
+        )
+        report = harness.run([("index", "GET", "/", {})])
+        self.assertEqual(report["routes"][0]["errors"], 3)
+        self.assertEqual(report["routes"][0]["statuses"], [NO_RESPONSE])
@@ -0,0 +1,47 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from . import metrics
+from .models import Post, User
+
+
+class TestsOfMetrics(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.registry.reset()
+        self.author = User.objects.create_user(username="author")
+        self.staff = User.objects.create_user(username="staff", is_staff=True)
+        self.client = Client()
+
+    def test_server_timing_header(self):
+        """Tests that responses report database, template,
+        cache and total time in the Server-Timing header"""
+
+        Post.objects.create(text="Текст поста", author=self.author)
+        response = self.client.get(reverse("index"))
+        timing = response["Server-Timing"]
+        for name in ("db;dur=", "tpl;dur=", "cache;desc=", "total;dur="):
+            self.assertIn(name, timing)
+        self.assertNotIn('desc="0 queries"', timing)
+
+    def test_metrics_are_aggregated_per_route(self):
+        """Tests that the metrics endpoint shows per-route
+        histograms and cache lookups to staff only"""
+
+        self.client.get(reverse("index"))
+        self.client.get(reverse("index"))
+
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 302)
+
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn('yatube_request_duration_seconds_count{route="index"} 2', text)
+        self.assertIn('yatube_request_queries_bucket{route="index",le="+Inf"} 2', text)
+        self.assertIn(
+            'yatube_requests_total{route="index",method="GET",status="200"} 2', text
+        )
+        self.assertIn('yatube_cache_requests_total{route="index",result="hit"}', text)
@@ -0,0 +1,108 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from . import counters
+from .models import Comment, Follow, Group, Post, User
+
+GIF = (
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04"
+    b"\x00\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+)
+
+
+class TestsOfNdjson(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media)
+        settings = override_settings(MEDIA_ROOT=self.media)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.author = User.objects.create_user(username="author", password="secret")
+        self.reader = User.objects.create_user(username="reader")
+        self.group = Group.objects.create(title="Кошки", slug="cats", description="-")
+        self.post = Post.objects.create(
+            text="Пост с картинкой",
+            author=self.author,
+            group=self.group,
+            image=SimpleUploadedFile("small.gif", GIF, content_type="image/gif"),
+        )
+        Post.objects.create(text="Второй пост", author=self.reader)
+        Comment.objects.create(post=self.post, author=self.reader, text="Отзыв")
+        Follow.objects.create(user=self.reader, author=self.author)
+
+    def export(self, images=None):
+        output = io.StringIO()
+        call_command("export_posts", images=images, stdout=output, stderr=io.StringIO())
+        return output.getvalue()
+
+    def load(self, data, images=None):
+        path = os.path.join(self.media, "dump.ndjson")
+        with open(path, "w", encoding="utf-8") as dump:
+            dump.write(data)
+        call_command("import_posts", path, images=images, stdout=io.StringIO())
+
+    def wipe(self):
+        Comment.objects.all().delete()
+        Follow.objects.all().delete()
+        Post.objects.all().delete()
+        Group.objects.all().delete()
+        User.objects.all().delete()
+
+    def test_round_trip(self):
+        """Tests that an export imported into an empty
+        database restores rows, keys, dates and images"""
+
+        archive = os.path.join(self.media, "images.tar")
+        data = self.export(images=archive)
+        lines = [json.loads(line) for line in data.splitlines()]
+        self.assertEqual(
+            [line["model"] for line in lines],
+            ["user", "user", "group", "post", "post", "comment", "follow"],
+        )
+        pub_date = self.post.pub_date
+        image = self.post.image.name
+        os.remove(os.path.join(self.media, image))
+
+        self.wipe()
+        self.load(data, images=archive)
+
+        post = Post.objects.get(text="Пост с картинкой")
+        self.assertEqual(post.author.username, "author")
+        self.assertEqual(post.group.slug, "cats")
+        self.assertEqual(post.pub_date, pub_date)
+        self.assertEqual(post.image.name, image)
+        self.assertTrue(os.path.exists(os.path.join(self.media, image)))
+        self.assertEqual(post.comments.get().author.username, "reader")
+        self.assertTrue(Follow.objects.filter(author=post.author).exists())
+        self.assertTrue(post.author.check_password("secret"))
+        self.assertEqual(counters.repair(fix=False), [])
+        self.assertEqual(post.author.stats.posts_count, 1)
+
+    def test_import_skips_existing_rows(self):
+        """Tests that importing the same data twice
+        does not duplicate anything"""
+
+        data = self.export()
+        self.load(data)
+        self.assertEqual(User.objects.count(), 2)
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(Follow.objects.count(), 1)
+
+    def test_unknown_keys_fail(self):
+        """Tests that a row referring to a missing
+        user stops the import with an error"""
+
+        line = {"model": "follow", "user": "ghost", "author": "author"}
+        line["updated"] = "2020-01-01T00:00:00+00:00"
+        with self.assertRaises(CommandError):
+            self.load(json.dumps(line) + "\n")
@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Comment, Group, Post, User
+
+
+class TestsOfAnonymousPageCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author")
+        self.group = Group.objects.create(title="Кошки", slug="cats", description="-")
+        self.post = Post.objects.create(
+            text="Текст поста", author=self.author, group=self.group
+        )
+        self.client = Client()
+        self.urls = [
+            reverse("index"),
+            reverse("group", kwargs={"slug": "cats"}),
+            reverse("profile", kwargs={"username": "author"}),
+            reverse("post", kwargs={"username": "author", "post_id": self.post.pk}),
+        ]
+
+    def test_hot_pages_skip_the_database(self):
+        """Tests that repeated anonymous requests
+        are served without database queries"""
+
+        for url in self.urls:
+            first = self.client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                second = self.client.get(url)
+            self.assertEqual(len(queries), 0, url)
+            self.assertEqual(second.content, first.content)
+
+    def test_sessions_bypass_the_cache(self):
+        """Tests that logged in readers never get
+        the anonymous copy of a page"""
+
+        url = self.urls[0]
+        self.client.get(url)
+        self.client.force_login(self.author)
+        response = self.client.get(url)
+        self.assertContains(response, "Новая запись")
+
+    def test_writes_invalidate_affected_pages(self):
+        """Tests that comments and edits reach the
+        cached pages of the post, author and group"""
+
+        for url in self.urls:
+            self.client.get(url)
+        Comment.objects.create(post=self.post, author=self.author, text="Отзыв")
+        self.assertContains(self.client.get(self.urls[3]), "Отзыв")
+
+        self.post.text = "Исправленный текст"
+        self.post.save()
+        for url in self.urls:
+            self.assertContains(self.client.get(url), "Исправленный текст")
+
+    @override_settings(POSTS_REPLICAS=["default"], POSTS_REPLICA_LAG=0)
+    def test_replica_reads_are_not_cached_past_the_lag(self):
+        """Tests that pages and fragments rendered from a replica
+        are not kept longer than the replica may lag behind"""
+
+        reader = Client()
+        reader.force_login(User.objects.create_user(username="reader"))
+        posts = Post.objects.filter(pk=self.post.pk)
+        for client in (self.client, reader):
+            client.get(self.urls[0])
+            # The replica catches up with a write after the page was cached.
+            posts.update(text=f"Догнала {client is reader}", updated=timezone.now())
+            response = client.get(self.urls[0])
+            self.assertContains(response, f"Догнала {client is reader}")
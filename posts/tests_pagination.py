@@ -0,0 +1,63 @@
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from .models import Post, User
+from .pagination import CursorPaginator
+
+
+class TestsOfCursorPagination(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.author = User.objects.create_user(username="cursor_author")
+        for i in range(25):
+            Post.objects.create(text=f"cursor post {i}", author=self.author)
+
+    def test_pages_do_not_overlap(self):
+        """Tests that walking older cursors visits
+        every post exactly once, newest first"""
+
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        seen = []
+        page = paginator.get_page()
+        seen.extend(page)
+        while page.has_next():
+            page = paginator.get_page(after=page.next_cursor)
+            seen.extend(page)
+
+        expected = list(Post.objects.order_by("-pub_date", "-pk"))
+        self.assertEqual(seen, expected)
+
+    def test_newer_cursor_returns_previous_page(self):
+        """Tests that the before cursor of the second
+        page leads back to the first page"""
+
+        paginator = CursorPaginator(Post.objects.all(), 10)
+        first = paginator.get_page()
+        second = paginator.get_page(after=first.next_cursor)
+        back = paginator.get_page(before=second.previous_cursor)
+
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+        self.assertTrue(back.has_next())
+
+    def test_cursor_mode_in_views(self):
+        """Tests that feeds switch to cursor mode
+        on request and render older links"""
+
+        response = self.client.get(reverse("index"), {"after": ""})
+        self.assertTrue(response.context["page"].is_cursor)
+        self.assertEqual(len(response.context["page"]), 10)
+        self.assertContains(response, "?after=")
+
+        with override_settings(POSTS_PAGINATION="cursor"):
+            response = self.client.get(
+                reverse("profile", kwargs={"username": self.author.username})
+            )
+        self.assertTrue(response.context["page"].is_cursor)
+
+    def test_broken_cursor_falls_back_to_first_page(self):
+        """Tests that a malformed cursor is
+        treated as the first page"""
+
+        response = self.client.get(reverse("index"), {"after": "%%%"})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context["page"].has_previous())
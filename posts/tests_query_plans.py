@@ -0,0 +1,79 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from .models import Post, User, Group, Follow, Comment
+from .query_plans import problems
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN is SQLite syntax")
+class TestsOfQueryPlans(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author")
+        self.reader = User.objects.create_user(username="reader")
+        self.group = Group.objects.create(title="g", slug="g", description="g")
+        Follow.objects.create(user=self.reader, author=self.author)
+        for i in range(15):
+            self.post = Post.objects.create(
+                text=f"post {i}", author=self.author, group=self.group
+            )
+            Comment.objects.create(post=self.post, author=self.reader, text="c")
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def assert_indexed(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        for query in queries:
+            sql = query["sql"]
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            self.assertEqual(problems(sql), [], f"{url}: {sql}")
+        return response
+
+    def test_views_use_indexes(self):
+        """Tests that no view query falls back to
+        a full table scan or a temporary sort"""
+
+        urls = [
+            reverse("index"),
+            reverse("group", kwargs={"slug": "g"}),
+            reverse("groups"),
+            reverse("profile", kwargs={"username": "author"}),
+            reverse("follow_index"),
+            reverse("post", kwargs={"username": "author", "post_id": self.post.pk}),
+            reverse(
+                "post_comments",
+                kwargs={"username": "author", "post_id": self.post.pk},
+            ),
+        ]
+        for url in urls:
+            response = self.assert_indexed(url, {"page": 2})
+            if "paginator" in response.context:
+                page = self.assert_indexed(url, {"after": ""}).context["page"]
+                self.assert_indexed(url, {"after": page.next_cursor})
+                self.assert_indexed(url, {"before": page.next_cursor})
+        # Ranked by score, so it pages by number only.
+        self.assert_indexed(reverse("trending"), {"page": 2})
+
+    def test_api_uses_indexes(self):
+        """Tests that the JSON API pages are
+        read through indexes as well"""
+
+        urls = [
+            reverse("api_index"),
+            reverse("api_group", kwargs={"slug": "g"}),
+            reverse("api_profile", kwargs={"username": "author"}),
+            reverse("api_follow"),
+            reverse("api_comments", kwargs={"post_id": self.post.pk}),
+        ]
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, {"limit": 5})
+                b"".join(response.streaming_content)
+            for query in queries:
+                if query["sql"].lstrip().upper().startswith("SELECT"):
+                    self.assertEqual(problems(query["sql"]), [], url)
@@ -0,0 +1,93 @@
+import os
+import sqlite3
+import tempfile
+import time
+
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase
+from django.test import override_settings
+
+from . import replicas
+from .models import Post, User
+
+router = replicas.ReplicaRouter()
+
+
+@override_settings(POSTS_REPLICAS=["replica"])
+class TestsOfReplicaRouting(TestCase):
+    def setUp(self):
+        replicas.reset()
+        self.factory = RequestFactory()
+        self.client = Client()
+
+    def route(self, request):
+        @replicas.read_replica
+        def view(request):
+            return router.db_for_read(Post)
+
+        request.session = {}
+        return view(request)
+
+    def test_reads_go_to_replicas(self):
+        """Tests that read views use a replica while writes
+        and everything outside them use the primary"""
+
+        self.assertEqual(self.route(self.factory.get("/")), "replica")
+        self.assertEqual(self.route(self.factory.post("/")), "default")
+        self.assertEqual(router.db_for_read(Post), "default")
+        with replicas.replica():
+            self.assertEqual(router.db_for_write(Post), "default")
+            self.assertEqual(router.db_for_read(Post), "default")
+
+    def test_writes_pin_the_session(self):
+        """Tests that a session that wrote something
+        reads from the primary for a while"""
+
+        user = User.objects.create_user(username="author")
+        self.client.force_login(user)
+        self.client.post("/new/", {"text": "Текст"})
+        until = self.client.session[replicas.PIN_SESSION_KEY]
+        self.assertGreater(until, time.time())
+
+        replicas.reset()
+        request = self.factory.get("/")
+
+        @replicas.read_replica
+        def view(request):
+            return router.db_for_read(Post)
+
+        request.session = {replicas.PIN_SESSION_KEY: until}
+        self.assertEqual(view(request), "default")
+
+
+class TestsOfReplicaPinning(TestCase):
+    def test_following_by_link_pins_the_session(self):
+        """Tests that a follow made through a GET link pins
+        the session while plain reads do not"""
+
+        User.objects.create_user(username="author")
+        self.client.force_login(User.objects.create_user(username="reader"))
+        self.client.get("/author/")
+        self.assertNotIn(replicas.PIN_SESSION_KEY, self.client.session)
+        self.client.get("/author/follow/")
+        self.assertGreater(self.client.session[replicas.PIN_SESSION_KEY], time.time())
+
+
+class TestsOfReplicaRefresh(TransactionTestCase):
+    # The copy is made with SQLite's backup, which needs committed rows.
+    def test_refresh_copies_the_primary(self):
+        """Tests that refreshing a replica copies
+        the primary database into it"""
+
+        author = User.objects.create_user(username="author")
+        Post.objects.create(text="Текст", author=author)
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "replica.sqlite3")
+        try:
+            replicas.copy_primary(path)
+            replica = sqlite3.connect(path)
+            count = replica.execute("SELECT COUNT(*) FROM posts_post").fetchone()
+            replica.close()
+        finally:
+            os.remove(path)
+            os.rmdir(directory)
+        self.assertEqual(count, (1,))
@@ -0,0 +1,70 @@
+from unittest import mock
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from .models import Post, User
+
+
+class TestsOfSearch(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author")
+        self.client = Client()
+
+    def search(self, query, **params):
+        params["q"] = query
+        return self.client.get(reverse("search"), params)
+
+    def texts(self, response):
+        return [post.text for post in response.context["page"]]
+
+    def test_index_follows_create_edit_delete(self):
+        """Tests that the search index is updated
+        when posts are created, edited and deleted"""
+
+        post = Post.objects.create(text="Рыжий кот спит", author=self.author)
+        self.assertEqual(self.texts(self.search("кот")), ["Рыжий кот спит"])
+
+        post.text = "Рыжая собака спит"
+        post.save()
+        self.assertEqual(self.texts(self.search("кот")), [])
+        self.assertEqual(self.texts(self.search("собака")), ["Рыжая собака спит"])
+
+        post.delete()
+        self.assertEqual(self.texts(self.search("собака")), [])
+
+    def test_results_are_ranked_and_paginated(self):
+        """Tests that better matches come first and
+        cursors walk through all results once"""
+
+        for i in range(12):
+            Post.objects.create(text=f"cats and dogs {i}", author=self.author)
+        Post.objects.create(text="cats cats cats", author=self.author)
+
+        first = self.search("cats")
+        self.assertEqual(self.texts(first)[0], "cats cats cats")
+        self.assertEqual(len(first.context["page"]), 10)
+
+        second = self.search("cats", after=first.context["page"].next_cursor)
+        self.assertEqual(len(second.context["page"]), 3)
+        self.assertFalse(second.context["page"].has_next())
+        seen = self.texts(first) + self.texts(second)
+        self.assertEqual(len(set(seen)), 13)
+
+    def test_query_syntax_is_escaped(self):
+        """Tests that FTS operators in user input
+        do not break the search"""
+
+        Post.objects.create(text="quotes and stars", author=self.author)
+        response = self.search('"quotes* (stars')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.texts(response), ["quotes and stars"])
+
+    def test_empty_query_finds_nothing(self):
+        """Tests that an empty query returns an empty page
+        with and without the full-text index"""
+
+        Post.objects.create(text="anything", author=self.author)
+        self.assertEqual(self.texts(self.search("  ")), [])
+        with mock.patch("posts.search.available", return_value=False):
+            self.assertEqual(self.texts(self.search("")), [])
+            self.assertEqual(self.texts(self.search("any")), ["anything"])
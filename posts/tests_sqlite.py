@@ -0,0 +1,51 @@
+import os
+import tempfile
+
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from .models import Post, User
+from .sqlite import Benchmark
+
+
+class TestsOfSqliteProfile(TestCase):
+    @override_settings(POSTS_SQLITE_PROFILE="production")
+    def test_production_pragmas_are_applied(self):
+        """Tests that new connections get the pragmas
+        of the production profile"""
+
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "db.sqlite3")
+        default = connections["default"]
+        wrapper = type(default)({**default.settings_dict, "NAME": path})
+        try:
+            with wrapper.cursor() as cursor:
+                values = {
+                    name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                    for name in ("journal_mode", "synchronous", "busy_timeout")
+                }
+        finally:
+            wrapper.close()
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+            os.rmdir(directory)
+        self.assertEqual(
+            values, {"journal_mode": "wal", "synchronous": 1, "busy_timeout": 5000}
+        )
+
+
+class TestsOfSqliteBenchmark(TransactionTestCase):
+    # The benchmark copies the database, which needs committed rows.
+    def test_benchmark_compares_both_modes(self):
+        """Tests that the benchmark drives reads and writes
+        in both modes"""
+
+        author = User.objects.create_user(username="author")
+        Post.objects.create(text="Текст", author=author)
+        report = Benchmark(seconds=0.2, readers=1, writers=1).run()
+        self.assertEqual(set(report), {"baseline", "production"})
+        for row in report.values():
+            self.assertGreater(row["reads_per_second"], 0)
+            self.assertGreater(row["writes_per_second"], 0)
+            self.assertEqual(row["errors"], 0)
+        self.assertEqual(Post.objects.get().comments_count, 0)
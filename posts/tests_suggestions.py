@@ -0,0 +1,79 @@
+import io
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from . import suggestions
+from .models import Follow, FollowSuggestion, Group, Post, User, UserStats
+
+
+class TestsOfSuggestions(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader, self.friend, self.fof, self.neighbour = [
+            User.objects.create_user(username=name)
+            for name in ("reader", "friend", "fof", "neighbour")
+        ]
+        group = Group.objects.create(title="Кошки", slug="cats", description="-")
+        Follow.objects.create(user=self.reader, author=self.friend)
+        Follow.objects.create(user=self.friend, author=self.fof)
+        Post.objects.create(text="Текст", author=self.reader, group=group)
+        Post.objects.create(text="Текст", author=self.neighbour, group=group)
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_candidates_come_from_follows_and_groups(self):
+        """Tests that suggestions are authors two follows away
+        and authors posting in the same groups"""
+
+        self.assertEqual(
+            suggestions.candidates(self.reader.pk),
+            [(self.fof.pk, 1.0), (self.neighbour.pk, 0.5)],
+        )
+
+    def test_worker_stores_and_follows_update_suggestions(self):
+        """Tests that the worker stores suggestions the pages show
+        and that following a suggested author takes it out"""
+
+        call_command("refresh_suggestions", "--once", stdout=io.StringIO())
+        self.assertFalse(UserStats.objects.filter(suggestions_stale=True).exists())
+        response = self.client.get(reverse("follow_index"))
+        self.assertEqual(
+            [item.author for item in response.context["suggestions"]],
+            [self.fof, self.neighbour],
+        )
+
+        self.client.get(reverse("profile_follow", kwargs={"username": "fof"}))
+        self.assertFalse(
+            FollowSuggestion.objects.filter(user=self.reader, author=self.fof).exists()
+        )
+        stale = UserStats.objects.filter(suggestions_stale=True)
+        self.assertEqual(set(stale.values_list("user_id", flat=True)), {self.reader.pk})
+        response = self.client.get(reverse("profile", kwargs={"username": "friend"}))
+        self.assertEqual(
+            [item.author for item in response.context["suggestions"]],
+            [self.neighbour],
+        )
+
+    def test_posting_in_a_group_marks_co_posters_stale(self):
+        """Tests that a first post in a group queues the author
+        and the group's other posters for a refresh"""
+
+        call_command("refresh_suggestions", "--once", stdout=io.StringIO())
+        dogs = Group.objects.create(title="Собаки", slug="dogs", description="-")
+        Post.objects.create(text="Текст", author=self.fof, group=dogs)
+        stale = UserStats.objects.filter(suggestions_stale=True)
+        self.assertEqual(set(stale.values_list("user_id", flat=True)), {self.fof.pk})
+
+        call_command("refresh_suggestions", "--once", stdout=io.StringIO())
+        Post.objects.create(text="Текст", author=self.fof, group=dogs)
+        self.assertFalse(stale.exists())
+        post = Post.objects.create(text="Текст", author=self.friend)
+        post.group = Group.objects.get(slug="cats")
+        post.save()
+        self.assertEqual(
+            set(stale.values_list("user_id", flat=True)),
+            {self.reader.pk, self.friend.pk, self.neighbour.pk},
+        )
@@ -0,0 +1,130 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from PIL import Image
+from .models import Post, User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class TestsOfThumbnails(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.author = User.objects.create_user(username="author")
+        self.client = Client()
+        buffer = io.BytesIO()
+        Image.new("RGB", (1200, 800), "red").save(buffer, "JPEG")
+        self.post = Post.objects.create(
+            text="with image",
+            author=self.author,
+            image=SimpleUploadedFile("photo.jpg", buffer.getvalue()),
+        )
+        self.url = reverse(
+            "post", kwargs={"username": "author", "post_id": self.post.pk}
+        )
+
+    def test_template_never_generates_inline(self):
+        """Tests that a post without generated thumbnails
+        renders a placeholder and never resizes inline"""
+
+        with mock.patch("sorl.thumbnail.base.ThumbnailBackend.get_thumbnail") as get:
+            response = self.client.get(self.url)
+        self.assertContains(response, "data:image/gif")
+        get.assert_not_called()
+
+    def test_worker_generates_thumbnails(self):
+        """Tests that the worker command creates thumbnails
+        and the page then links to them"""
+
+        call_command("thumbnail_worker", "--once", "--workers=0", stdout=io.StringIO())
+
+        self.post.refresh_from_db()
+        self.assertTrue(self.post.thumbnails_ready)
+        response = self.client.get(self.url)
+        self.assertNotContains(response, "data:image/gif")
+        self.assertContains(response, 'width="960" height="339"')
+
+    def test_new_upload_resets_thumbnails(self):
+        """Tests that replacing the image marks
+        the thumbnails as pending again"""
+
+        Post.objects.filter(pk=self.post.pk).update(thumbnails_ready=True)
+        post = Post.objects.get(pk=self.post.pk)
+        post.image = SimpleUploadedFile("other.gif", b"GIF89a")
+        post.save()
+
+        self.assertFalse(Post.objects.get(pk=self.post.pk).thumbnails_ready)
+
+    def test_worker_normalizes_uploads(self):
+        """Tests that the worker turns the EXIF orientation into pixels,
+        caps the resolution and stores the size on the post"""
+
+        buffer = io.BytesIO()
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Rotated: shown 90 degrees clockwise.
+        Image.new("RGB", (3000, 1000), "red").save(buffer, "JPEG", exif=exif)
+        post = Post.objects.create(
+            text="phone photo",
+            author=self.author,
+            image=SimpleUploadedFile("phone.jpg", buffer.getvalue()),
+        )
+        original = post.image.name
+
+        call_command("thumbnail_worker", "--once", "--workers=0", stdout=io.StringIO())
+
+        post.refresh_from_db()
+        self.assertTrue(post.image.name.endswith(".webp"))
+        self.assertEqual((post.image_width, post.image_height), (683, 2048))
+        self.assertEqual(post.image_size, post.image.size)
+        self.assertFalse(default_storage.exists(original))
+        self.assertTrue(post.thumbnails_ready)
+
+    def test_worker_skips_broken_uploads(self):
+        """Tests that a file that is not an image
+        is reported and left without dimensions"""
+
+        post = Post.objects.create(
+            text="broken",
+            author=self.author,
+            image=SimpleUploadedFile("broken.jpg", b"not an image"),
+        )
+        stderr = io.StringIO()
+        with self.assertLogs("posts.management.commands.thumbnail_worker"):
+            call_command(
+                "thumbnail_worker",
+                "--once",
+                "--workers=0",
+                "--processes=0",
+                stdout=io.StringIO(),
+                stderr=stderr,
+            )
+
+        post.refresh_from_db()
+        self.assertIsNone(post.image_width)
+        self.assertFalse(post.thumbnails_ready)
+        self.assertIn(f"Post {post.pk}: could not normalize", stderr.getvalue())
+
+    def test_cards_render_from_the_manifest(self):
+        """Tests that cards of processed posts are rendered
+        without looking anything up in sorl's key-value store"""
+
+        call_command("thumbnail_worker", "--once", "--workers=0", stdout=io.StringIO())
+        self.post.refresh_from_db()
+        self.assertIn('"card"', self.post.thumbnails)
+
+        with mock.patch("sorl.thumbnail.kvstores.base.KVStoreBase.get") as get:
+            response = self.client.get(self.url)
+        get.assert_not_called()
+        self.assertContains(response, 'width="960" height="339"')
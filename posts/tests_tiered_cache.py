@@ -0,0 +1,132 @@
+import shutil
+import tempfile
+import threading
+import time
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from . import metrics
+from .backends import TieredCache
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "shared": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "tiered-tests",
+    },
+}
+
+
+def worker(name, **options):
+    """A tiered cache as one worker process would have it."""
+    options = {"SHARED": "shared", "SHARED_ONLY": ["generation:"], **options}
+    return TieredCache(name, {"OPTIONS": options})
+
+
+@override_settings(CACHES=CACHES)
+class TestsOfTieredCache(TestCase):
+    def setUp(self):
+        caches["shared"].clear()
+        self.first = worker("first")
+        self.second = worker("second")
+        self.first.local.clear()
+        self.second.local.clear()
+
+    def test_workers_share_values(self):
+        """Tests that a value one worker stores
+        is read by the others"""
+
+        self.first.set("key", "value")
+        self.assertEqual(self.second.get("key"), "value")
+        self.assertEqual(self.second.get_many(["key", "other"]), {"key": "value"})
+
+    def test_shared_only_keys_skip_the_local_copy(self):
+        """Tests that keys listed in SHARED_ONLY are seen
+        by every worker as soon as one of them changes them"""
+
+        self.first.set("generation:index", 1)
+        self.first.set("page", 1)
+        self.assertEqual(self.second.get("generation:index"), 1)
+        self.assertEqual(self.second.get("page"), 1)
+
+        caches["shared"].set_many(
+            {"generation:index": (2, None, 0.0), "page": (2, None, 0.0)}
+        )
+        self.assertEqual(self.second.get("generation:index"), 2)
+        self.assertEqual(self.second.get("page"), 1)
+
+    def test_expiring_values_are_recomputed_once(self):
+        """Tests that an expired value is handed out as a miss
+        to one reader while the others keep getting it"""
+
+        caches["shared"].set("key", ("value", time.time() - 1, 0.1))
+        self.assertIsNone(self.first.get("key"))
+        self.assertEqual(self.second.get("key"), "value")
+
+        self.first.set("key", "fresh", 60)
+        self.assertEqual(self.second.get("key"), "fresh")
+        self.assertFalse(caches["shared"].has_key("key:lock"))
+
+    def test_get_many_recomputes_expiring_values_once(self):
+        """Tests that get_many hands an expiring value out as a miss
+        to one reader, like get does"""
+
+        caches["shared"].set("key", ("value", time.time() - 1, 0.1))
+        self.assertEqual(self.first.get_many(["key"]), {})
+        self.assertEqual(self.second.get_many(["key"]), {"key": "value"})
+        self.assertEqual(self.second.get("key"), "value")
+
+    def test_reads_are_counted_in_the_request_metrics(self):
+        """Tests that get and get_many record their hits and misses
+        in the timings of the running request"""
+
+        self.first.set("key", "value")
+        timings = metrics.start()
+        self.addCleanup(metrics.finish)
+        self.second.get("key")
+        self.second.get("other")
+        self.second.get_many(["key", "other", "third"])
+        self.assertEqual((timings.cache_hits, timings.cache_misses), (2, 3))
+
+    def test_concurrent_misses_compute_once(self):
+        """Tests that get_or_set runs the computation once when several
+        workers miss the same key of a shared cache on disk together"""
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        on_disk = {
+            **CACHES,
+            "shared": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": directory,
+            },
+        }
+        calls, results = [], []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        def read(index):
+            results.append(worker(f"thread-{index}").get_or_set("key", compute))
+
+        with self.settings(CACHES=on_disk):
+            threads = [threading.Thread(target=read, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(len(calls), 1)
+            self.assertEqual(results, ["value"] * 8)
+            self.assertFalse(worker("check")._locked("key", None))
+
+    def test_nothing_stored_when_computation_returns_none(self):
+        """Tests that get_or_set stores nothing for None
+        and lets waiting workers go at once"""
+
+        self.assertIsNone(self.first.get_or_set("key", lambda: None))
+        self.assertFalse(caches["shared"].has_key("key"))
+        self.assertFalse(caches["shared"].has_key("key:lock"))
+        self.assertEqual(self.second.get_or_set("key", lambda: "value"), "value")
@@ -0,0 +1,53 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+from .models import Post, User, Follow, TimelineEntry
+
+
+class TestsOfTimeline(TestCase):
+    def setUp(self):
+        self.reader = User.objects.create_user(username="reader")
+        self.author = User.objects.create_user(username="author")
+        self.stranger = User.objects.create_user(username="stranger")
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def timeline_texts(self):
+        response = self.client.get(reverse("follow_index"))
+        return [post.text for post in response.context["page"]]
+
+    def test_new_post_is_fanned_out(self):
+        """Tests that a new post lands only in
+        the timelines of the author's followers"""
+
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.create(text="fresh post", author=self.author)
+        Post.objects.create(text="stranger post", author=self.stranger)
+
+        self.assertEqual(self.timeline_texts(), ["fresh post"])
+
+    def test_follow_backfills_and_unfollow_removes(self):
+        """Tests that following backfills old posts
+        and unfollowing removes them"""
+
+        Post.objects.create(text="old post 1", author=self.author)
+        Post.objects.create(text="old post 2", author=self.author)
+
+        self.client.get(reverse("profile_follow", kwargs={"username": "author"}))
+        self.assertEqual(self.timeline_texts(), ["old post 2", "old post 1"])
+
+        self.client.get(reverse("profile_unfollow", kwargs={"username": "author"}))
+        self.assertEqual(self.timeline_texts(), [])
+
+    def test_rebuild_command(self):
+        """Tests that the rebuild command restores
+        a timeline from the follow graph"""
+
+        Follow.objects.create(user=self.reader, author=self.author)
+        Post.objects.create(text="post", author=self.author)
+        TimelineEntry.objects.all().delete()
+
+        call_command("rebuild_timelines", "reader", stdout=StringIO())
+
+        self.assertEqual(self.timeline_texts(), ["post"])
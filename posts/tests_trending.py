@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from . import follow_graph, trending
+from .models import Follow, Post, User
+
+
+class TestsOfTrending(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username="author")
+        self.other = User.objects.create_user(username="other")
+        self.reader = User.objects.create_user(username="reader")
+        self.old = Post.objects.create(text="Старый пост", author=self.author)
+        self.new = Post.objects.create(text="Новый пост", author=self.other)
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def page(self):
+        response = self.client.get(reverse("trending"))
+        return list(response.context["page"])
+
+    def test_comments_lift_a_post(self):
+        """Tests that a comment raises the post's score
+        and moves it up the trending page right away"""
+
+        self.assertEqual(self.page(), [self.new, self.old])
+        before = Post.objects.get(pk=self.old.pk).trend_score
+        self.client.post(
+            reverse(
+                "add_comment", kwargs={"username": "author", "post_id": self.old.pk}
+            ),
+            {"text": "Комментарий"},
+        )
+        self.assertGreater(Post.objects.get(pk=self.old.pk).trend_score, before)
+        self.assertEqual(self.page(), [self.old, self.new])
+
+    def test_rebuild_matches_incremental_scores(self):
+        """Tests that recomputing every score from scratch gives
+        what comments and follows added one by one"""
+
+        self.client.post(
+            reverse(
+                "add_comment", kwargs={"username": "other", "post_id": self.new.pk}
+            ),
+            {"text": "Комментарий"},
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+        scores = dict(Post.objects.values_list("pk", "trend_score"))
+
+        Post.objects.update(trend_score=0)
+        self.assertEqual(trending.rebuild(), 2)
+        for pk, score in Post.objects.values_list("pk", "trend_score"):
+            self.assertAlmostEqual(score, scores[pk], places=6)
+
+    def test_unfollowing_takes_the_follow_back(self):
+        """Tests that following, unfollowing and following again
+        counts one follow, as a rebuild does"""
+
+        before = Post.objects.get(pk=self.old.pk).trend_score
+        follow_graph.follow(self.reader, [self.author.pk])
+        follow_graph.unfollow(self.reader, [self.author.pk])
+        self.assertAlmostEqual(
+            Post.objects.get(pk=self.old.pk).trend_score, before, places=6
+        )
+
+        for _ in range(3):
+            follow_graph.follow(self.reader, [self.author.pk])
+            follow_graph.unfollow(self.reader, [self.author.pk])
+        follow_graph.follow(self.reader, [self.author.pk])
+        scores = dict(Post.objects.values_list("pk", "trend_score"))
+        trending.rebuild()
+        for pk, score in Post.objects.values_list("pk", "trend_score"):
+            self.assertAlmostEqual(score, scores[pk], places=6)
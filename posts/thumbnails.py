@@ -0,0 +1,71 @@
+import json
+import logging
+
+from django.utils import timezone
+from sorl.thumbnail import default, get_thumbnail
+
+from . import caching
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# Every thumbnail the templates show, by name: (geometry, sorl options).
+SIZES = {
+    "card": ("960x339", {"crop": "center", "upscale": True}),
+}
+
+
+def pending():
+    """Posts whose normalized image has no thumbnails yet, oldest first."""
+    return (
+        Post.objects.exclude(image="")
+        .exclude(image__isnull=True)
+        .filter(image_width__isnull=False, thumbnails_ready=False)
+        .order_by("pk")
+    )
+
+
+def generate(post_id, name):
+    """Create every template size of an uploaded image and mark the post ready.
+
+    Runs in the thumbnail worker, never in a request. The thumbnails are
+    recorded in the post's manifest. Returns whether all sizes could be
+    created.
+    """
+    try:
+        manifest = {}
+        for size, (geometry, options) in SIZES.items():
+            thumbnail = get_thumbnail(name, geometry, **options)
+            if not thumbnail.exists():
+                return False
+            manifest[size] = [thumbnail.name, thumbnail.width, thumbnail.height]
+        # Only flag the image we resized, not one uploaded in the meantime.
+        post = Post.objects.filter(pk=post_id, image=name)
+        updated = post.update(
+            thumbnails_ready=True,
+            thumbnails=json.dumps(manifest, separators=(",", ":")),
+            updated=timezone.now(),
+        )
+        if updated:
+            # Cards cached with the placeholder have to show the image now.
+            caching.invalidate_post(post.select_related("author", "group").get())
+        return True
+    except Exception:
+        logger.exception("Could not generate thumbnails for %s", name)
+        return False
+
+
+def lookup(post, size):
+    """``{"url", "width", "height"}`` of a generated thumbnail, or None.
+
+    Read from the post's manifest alone, without touching the image or
+    sorl's key-value store. Until the worker has processed the image the
+    templates show a placeholder.
+    """
+    if not post.image or not post.thumbnails_ready or not post.thumbnails:
+        return None
+    try:
+        name, width, height = json.loads(post.thumbnails)[size]
+    except (KeyError, ValueError):
+        return None
+    return {"url": default.storage.url(name), "width": width, "height": height}
@@ -0,0 +1,69 @@
+from django.db import transaction
+
+from .feeds import feed_queryset
+from .models import Follow, Post, TimelineEntry
+
+BATCH_SIZE = 500
+
+
+def _entry(user_id, post):
+    return TimelineEntry(
+        user_id=user_id,
+        post_id=post.pk,
+        author_id=post.author_id,
+        pub_date=post.pub_date,
+    )
+
+
+def fan_out(post):
+    """Deliver a freshly created post to the timelines of its author's followers."""
+    follower_ids = Follow.objects.filter(author_id=post.author_id).values_list(
+        "user_id", flat=True
+    )
+    entries = [_entry(user_id, post) for user_id in follower_ids]
+    TimelineEntry.objects.bulk_create(
+        entries, batch_size=BATCH_SIZE, ignore_conflicts=True
+    )
+
+
+def add_author(user_id, author_id):
+    """Backfill an author's posts into a new follower's timeline."""
+    posts = Post.objects.filter(author_id=author_id).only("pk", "author_id", "pub_date")
+    entries = (_entry(user_id, post) for post in posts.iterator())
+    _bulk_insert(entries)
+
+
+def remove_author(user_id, author_id):
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def rebuild(user_ids=None):
+    """Recreate timelines from the follow graph, for all users or the given ones."""
+    follows = Follow.objects.all()
+    entries = TimelineEntry.objects.all()
+    if user_ids is not None:
+        follows = follows.filter(user_id__in=user_ids)
+        entries = entries.filter(user_id__in=user_ids)
+    with transaction.atomic():
+        entries.delete()
+        for user_id, author_id in follows.values_list("user_id", "author_id"):
+            add_author(user_id, author_id)
+
+
+def hydrate(page):
+    """Replace the timeline entries of a page with their posts, keeping the order."""
+    post_ids = [entry.post_id for entry in page.object_list]
+    posts = feed_queryset().in_bulk(post_ids)
+    page.object_list = [posts[pk] for pk in post_ids if pk in posts]
+    return page
+
+
+def _bulk_insert(entries):
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= BATCH_SIZE:
+            TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
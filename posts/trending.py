@@ -0,0 +1,146 @@
+import datetime as dt
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+from django.utils import timezone
+
+from . import caching
+from .feeds import feed_queryset
+from .models import Comment, Follow, Post
+
+# Scores are kept in log space relative to this moment: an event of
+# weight w at time t adds w * 2 ** ((t - EPOCH) / half-life) to a post's
+# score, and ``trend_score`` is the natural log of the sum. Older events
+# weigh exponentially less than new ones, yet a stored score never has to
+# be decayed: all posts would be divided by the same factor.
+EPOCH = dt.datetime(2020, 1, 1, tzinfo=dt.timezone.utc)
+
+POST_WEIGHT = 1.0
+COMMENT_WEIGHT = 1.0
+FOLLOW_WEIGHT = 0.5
+
+# A new follower lifts the author's posts of this recent past.
+FOLLOW_WINDOW = dt.timedelta(days=3)
+
+BATCH_SIZE = 500
+
+# Smallest share of a score removing an event may leave.
+MIN_REMAINDER = 1e-9
+
+
+def half_life():
+    return getattr(settings, "POSTS_TREND_HALF_LIFE", 12 * 60 * 60)
+
+
+def log_weight(weight, moment):
+    """``trend_score`` of a single event of ``weight`` at ``moment``."""
+    elapsed = (moment - EPOCH).total_seconds()
+    return math.log(weight) + elapsed * math.log(2) / half_life()
+
+
+def log_add(a, b):
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def _add(queryset, weight, moment):
+    """Fold one event into the score of every post in ``queryset``.
+
+    A single UPDATE evaluating ``log(exp(score) + exp(event))`` in a form
+    that cannot overflow, so concurrent events never lose one another.
+    """
+    event = Value(log_weight(weight, moment), output_field=FloatField())
+    score = F("trend_score")
+    queryset.update(
+        trend_score=Greatest(score, event)
+        + Ln(
+            Value(1.0, output_field=FloatField())
+            + Exp(-Abs(score - event), output_field=FloatField())
+        )
+    )
+
+
+def _remove(queryset, weight, moment):
+    """Take an event folded in by ``_add`` back out of ``queryset``.
+
+    ``log(exp(score) - exp(event))``; the remainder is clamped so that
+    rounding can never take the logarithm of zero or less.
+    """
+    event = Value(log_weight(weight, moment), output_field=FloatField())
+    score = F("trend_score")
+    remainder = Value(1.0, output_field=FloatField()) - Exp(
+        event - score, output_field=FloatField()
+    )
+    queryset.update(
+        trend_score=score
+        + Ln(Greatest(remainder, Value(MIN_REMAINDER, output_field=FloatField())))
+    )
+
+
+def initial_score(post):
+    return log_weight(POST_WEIGHT, post.pub_date or timezone.now())
+
+
+def comment_added(comment):
+    _add(Post.objects.filter(pk=comment.post_id), COMMENT_WEIGHT, comment.created)
+
+
+def _recent(author_ids, moment):
+    return Post.objects.filter(
+        author_id__in=author_ids,
+        pub_date__gte=moment - FOLLOW_WINDOW,
+        pub_date__lte=moment,
+    )
+
+
+def author_followed(author_ids, moment=None):
+    moment = moment or timezone.now()
+    _add(_recent(author_ids, moment), FOLLOW_WEIGHT, moment)
+    caching.bump(caching.scope("trending"))
+
+
+def author_unfollowed(author_ids, moment):
+    """Undo ``author_followed`` for a follow made at ``moment``.
+
+    Without it following, unfollowing and following again would lift an
+    author's posts without end.
+    """
+    _remove(_recent(author_ids, moment), FOLLOW_WEIGHT, moment)
+    caching.bump(caching.scope("trending"))
+
+
+def feed():
+    """Posts by score, best first; a walk down the ``trend_score`` index."""
+    return feed_queryset().order_by("-trend_score", "-pk")
+
+
+def rebuild():
+    """Recompute every score from posts, comments and follows."""
+    scores = {}
+    recent_posts = defaultdict(list)
+    posts = Post.objects.order_by().values_list("pk", "author_id", "pub_date")
+    for pk, author_id, pub_date in posts.iterator():
+        scores[pk] = log_weight(POST_WEIGHT, pub_date)
+        recent_posts[author_id].append((pub_date, pk))
+
+    comments = Comment.objects.order_by().values_list("post_id", "created")
+    for post_id, created in comments.iterator():
+        scores[post_id] = log_add(scores[post_id], log_weight(COMMENT_WEIGHT, created))
+
+    follows = Follow.objects.order_by().values_list("author_id", "updated")
+    for author_id, moment in follows.iterator():
+        event = log_weight(FOLLOW_WEIGHT, moment)
+        for pub_date, pk in recent_posts.get(author_id, ()):
+            if moment - FOLLOW_WINDOW <= pub_date <= moment:
+                scores[pk] = log_add(scores[pk], event)
+
+    Post.objects.bulk_update(
+        [Post(pk=pk, trend_score=score) for pk, score in scores.items()],
+        ["trend_score"],
+        batch_size=BATCH_SIZE,
+    )
+    caching.bump(caching.scope("trending"))
+    return len(scores)
@@ -1,16 +1,36 @@
-from django.urls import path
+from django.urls import include, path
 from . import views
 
 
 urlpatterns = [
     path("", views.index, name="index"),
     path("new/", views.new_post, name="new_post"),
+    path("group/", views.group_list, name="groups"),
     path("group/<slug:slug>/", views.group_posts, name="group"),
     path("follow/", views.follow_index, name="follow_index"),
+    path("trending/", views.trending_posts, name="trending"),
+    path("search/", views.search_posts, name="search"),
+    path("metrics/", views.metrics_view, name="metrics"),
+    path("api/v1/", include("posts.api_urls")),
     path("<str:username>/", views.profile, name="profile"),
     path("<str:username>/<int:post_id>/", views.post, name="post"),
     path("<str:username>/<int:post_id>/edit/", views.post_edit, name="post_edit"),
+    path(
+        "<str:username>/<int:post_id>/comments/",
+        views.post_comments,
+        name="post_comments",
+    ),
     path("<username>/<int:post_id>/comment", views.add_comment, name="add_comment"),
+    path(
+        "<str:username>/following/",
+        views.profile_following,
+        name="profile_following",
+    ),
+    path(
+        "<str:username>/followers/",
+        views.profile_followers,
+        name="profile_followers",
+    ),
     path("<str:username>/follow/", views.profile_follow, name="profile_follow"),
     path("<str:username>/unfollow/", views.profile_unfollow, name="profile_unfollow"),
 ]
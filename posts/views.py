@@ -2,35 +2,93 @@ from django.shortcuts import render, get_object_or_404, get_list_or_404
 from django.views.generic import CreateView
 from .forms import PostForm, CommentForm
 from django.contrib.auth.decorators import login_required
-from .models import Post, Group, User, Comment, Follow
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse
+from .models import Post, Group, User, Comment, TimelineEntry
+from . import (
+    caching,
+    counters,
+    directory,
+    follow_graph,
+    metrics,
+    search,
+    suggestions,
+    timeline,
+    trending,
+)
+from .conditional import (
+    conditional,
+    group_modified,
+    index_modified,
+    post_modified,
+    profile_modified,
+)
+from django.db import transaction
 from django.shortcuts import redirect
 import datetime as dt
+from .feeds import feed_queryset
 from django.core.paginator import Paginator
+from .pagination import COMMENTS_PER_PAGE, POSTS_PER_PAGE, CursorPaginator, paginate
+from .replicas import read_replica
 
 
+@read_replica
+@conditional(index_modified)
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, 10)
-
-    page_number = request.GET.get("page")
-    page = paginator.get_page(page_number)
-    return render(request, "index.html", {"page": page, "paginator": paginator})
+    post_list = feed_queryset()
+    page, paginator = paginate(request, post_list)
+    context = {"page": page, "paginator": paginator}
+    context.update(caching.feed_context(request, "index"))
+    return render(request, "index.html", context)
 
 
+@read_replica
+@conditional(group_modified)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
 
-    posts_list = group.groups_posts.all()
-    paginator = Paginator(posts_list, 10)
-
-    page_number = request.GET.get("page")
-    page = paginator.get_page(page_number)
-    return render(
-        request, "group.html", {"group": group, "page": page, "paginator": paginator}
-    )
+    posts_list = feed_queryset(group.groups_posts.all())
+    page, paginator = paginate(request, posts_list)
+    context = {"group": group, "page": page, "paginator": paginator}
+    context.update(caching.feed_context(request, "group", group.slug))
+    return render(request, "group.html", context)
+
+
+@read_replica
+def group_list(request):
+    context = {"groups": directory.groups()}
+    context.update(caching.feed_context(request, "groups"))
+    return render(request, "groups.html", context)
+
+
+@read_replica
+def trending_posts(request):
+    # Scores are not dates, so this feed keeps page numbers.
+    paginator = Paginator(trending.feed(), POSTS_PER_PAGE)
+    page = paginator.get_page(request.GET.get("page"))
+    context = {"page": page, "paginator": paginator}
+    context.update(caching.feed_context(request, "trending"))
+    return render(request, "trending.html", context)
+
+
+def search_posts(request):
+    query = request.GET.get("q", "").strip()
+    if search.available():
+        paginator = search.SearchPaginator(query)
+        page = paginator.get_page(after=request.GET.get("after"))
+    else:
+        # An empty query matches nothing, as it does in the index.
+        posts = Post.objects.none()
+        if query:
+            posts = Post.objects.filter(text__icontains=query)
+        paginator = CursorPaginator(feed_queryset(posts), POSTS_PER_PAGE)
+        page = paginator.get_page(after=request.GET.get("after"))
+    context = {"query": query, "page": page, "paginator": paginator}
+    return render(request, "search.html", context)
 
 
 @login_required
+@transaction.atomic
 def new_post(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
     if not form.is_valid():
@@ -47,23 +105,22 @@ def new_post(request):
     return redirect("index")
 
 
+@read_replica
+@conditional(profile_modified)
 def profile(request, username):
 
-    author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-
-    paginator = Paginator(post_list, 10)
-    page_number = request.GET.get("page")
-    page = paginator.get_page(page_number)
+    author = get_object_or_404(User.objects.select_related("stats"), username=username)
+    post_list = feed_queryset(author.posts.all())
+    page, paginator = paginate(request, post_list)
 
-    following = (
-        request.user.is_authenticated
-        and Follow.objects.filter(author=author, user=request.user).exists()
+    following = request.user.is_authenticated and follow_graph.is_following(
+        request.user.pk, author.pk
     )
 
-    posts_count = len(post_list)
-    followers_count = Follow.objects.filter(author=author).count
-    following_count = Follow.objects.filter(user=author).count
+    stats = counters.stats_for(author)
+    posts_count = stats.posts_count
+    followers_count = stats.followers_count
+    following_count = stats.following_count
 
     context = {
         "page": page,
@@ -73,27 +130,56 @@ def profile(request, username):
         "following": following,
         "followers_count": followers_count,
         "following_count": following_count,
+        "suggestions": suggestions.for_user(request.user, exclude=author),
     }
+    context.update(caching.feed_context(request, "author", author.username))
 
     return render(request, "profile.html", context)
 
 
+def comments_page(post, after=None):
+    """Comments of the post past the ``after`` cursor, oldest first.
+
+    Returns the page as a queryset with the authors joined, and the cursor
+    of the following page, or None on the last page.
+    """
+    paginator = CursorPaginator(
+        Comment.objects.filter(post=post).select_related("author"),
+        COMMENTS_PER_PAGE,
+        keys=("created", "pk"),
+        ascending=True,
+    )
+    comments = paginator.seek(after)[:COMMENTS_PER_PAGE]
+    if len(comments) < COMMENTS_PER_PAGE:
+        return comments, None
+    cursor = paginator.encode_cursor(comments[COMMENTS_PER_PAGE - 1])
+    return comments, cursor if paginator.seek(cursor).exists() else None
+
+
+@read_replica
+@conditional(post_modified)
 def post(request, username, post_id):
 
-    author = get_object_or_404(User, username=username)
-    posts_count = author.posts.count()
-    post = get_object_or_404(Post, author__username=username, pk=post_id)
-    comments = post.comments.all()
+    post = get_object_or_404(
+        Post.objects.select_related("author__stats", "group"),
+        author__username=username,
+        pk=post_id,
+    )
+    author = post.author
+    comments, comments_next = comments_page(post, request.GET.get("comments_after"))
     form = CommentForm(request.POST or None)
 
-    followers_count = Follow.objects.filter(author=author).count
-    following_count = Follow.objects.filter(user=author).count
+    stats = counters.stats_for(author)
+    posts_count = stats.posts_count
+    followers_count = stats.followers_count
+    following_count = stats.following_count
 
     context = {
         "author": author,
         "post": post,
         "posts_count": posts_count,
         "comments": comments,
+        "comments_next": comments_next,
         "form": form,
         "followers_count": followers_count,
         "following_count": following_count,
@@ -103,6 +189,7 @@ def post(request, username, post_id):
 
 
 @login_required
+@transaction.atomic
 def post_edit(request, username, post_id):
 
     post = get_object_or_404(Post, pk=post_id, author__username=username)
@@ -127,6 +214,16 @@ def post_edit(request, username, post_id):
     return redirect("post", username=post.author.username, post_id=post.pk)
 
 
+@read_replica
+def post_comments(request, username, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related("author"), author__username=username, pk=post_id
+    )
+    comments, comments_next = comments_page(post, request.GET.get("after"))
+    context = {"post": post, "comments": comments, "comments_next": comments_next}
+    return render(request, "includes/comment_list.html", context)
+
+
 def page_not_found(request, exception):
     return render(request, "misc/404.html", {"path": request.path}, status=404)
 
@@ -136,21 +233,28 @@ def server_error(request):
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, username, post_id):
-    post = get_object_or_404(Post, author__username=username, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related("author__stats", "group"),
+        author__username=username,
+        pk=post_id,
+    )
     form = CommentForm(request.POST or None)
     if not form.is_valid():
-        author = get_object_or_404(User, username=username)
-        posts_count = author.posts.count()
-        comments = post.comments.all()
-        followers_count = Follow.objects.filter(author=author).count
-        following_count = Follow.objects.filter(user=author).count
+        author = post.author
+        comments, comments_next = comments_page(post)
+        stats = counters.stats_for(author)
+        posts_count = stats.posts_count
+        followers_count = stats.followers_count
+        following_count = stats.following_count
 
         context = {
             "author": author,
             "post": post,
             "posts_count": posts_count,
             "comments": comments,
+            "comments_next": comments_next,
             "form": form,
             "followers_count": followers_count,
             "following_count": following_count,
@@ -164,31 +268,71 @@ def add_comment(request, username, post_id):
     return redirect("post", username=post.author.username, post_id=post.pk)
 
 
+@read_replica
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
+    entries = TimelineEntry.objects.filter(user=request.user)
 
-    paginator = Paginator(posts, 10)
-    page_number = request.GET.get("page")
-    page = paginator.get_page(page_number)
+    page, paginator = paginate(request, entries, keys=("pub_date", "post_id"))
+    timeline.hydrate(page)
 
-    context = {"page": page, "paginator": paginator, "page_number": page_number}
+    context = {
+        "page": page,
+        "paginator": paginator,
+        "suggestions": suggestions.for_user(request.user),
+    }
+    context.update(caching.feed_context(request, "follow", request.user.pk))
     return render(request, "follow.html", context)
 
 
+def _follows(request, username, direction):
+    author = get_object_or_404(User, username=username)
+    pages = {
+        "following": follow_graph.following_page,
+        "followers": follow_graph.followers_page,
+    }
+    page = pages[direction](author.pk, request.GET.get("page"))
+    viewer = request.user.pk if request.user.is_authenticated else None
+    # One cached set answers the follow button of every user listed.
+    followed = follow_graph.following_among(viewer, [user.pk for user in page])
+    context = {
+        "author": author,
+        "direction": direction,
+        "page": page,
+        "paginator": page.paginator,
+        "followed": followed,
+    }
+    return render(request, "follows.html", context)
+
+
+@read_replica
+def profile_following(request, username):
+    return _follows(request, username, "following")
+
+
+@read_replica
+def profile_followers(request, username):
+    return _follows(request, username, "followers")
+
+
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
-    user = request.user
     author = get_object_or_404(User, username=username)
-    if user != author:
-        follow = Follow.objects.get_or_create(user=user, author=author)
+    follow_graph.follow(request.user, [author.pk])
     return redirect("profile", username=username)
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
-    user = request.user
-    author = User.objects.get(username=username)
-    follow = Follow.objects.filter(user=user, author=author)
-    follow.delete()
+    author = get_object_or_404(User, username=username)
+    follow_graph.unfollow(request.user, [author.pk])
     return redirect("profile", username=username)
+
+
+@staff_member_required
+def metrics_view(request):
+    return HttpResponse(
+        metrics.registry.render(), content_type="text/plain; version=0.0.4"
+    )
@@ -50,11 +50,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "posts.middleware.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    # Before the session and auth middleware, so hits never touch the database.
+    "posts.middleware.AnonymousPageCacheMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "posts.middleware.ReplicaPinMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -64,7 +68,7 @@ ROOT_URLCONF = "yatube.urls"
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "posts.backends.InstrumentedTemplates",
         "DIRS": [TEMPLATES_DIR],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -78,6 +82,22 @@ TEMPLATES = [
     },
 ]
 
+# Django already keeps parsed templates in memory (the cached loader)
+# when DEBUG is off. YATUBE_CACHED_TEMPLATES=1 turns that on with DEBUG
+# on as well, e.g. to profile locally; without it DEBUG re-reads
+# templates on every render so edits show up.
+if os.environ.get("YATUBE_CACHED_TEMPLATES") == "1":
+    TEMPLATES[0]["APP_DIRS"] = False
+    TEMPLATES[0]["OPTIONS"]["loaders"] = [
+        (
+            "django.template.loaders.cached.Loader",
+            [
+                "django.template.loaders.filesystem.Loader",
+                "django.template.loaders.app_directories.Loader",
+            ],
+        )
+    ]
+
 WSGI_APPLICATION = "yatube.wsgi.application"
 
 
@@ -91,6 +111,35 @@ DATABASES = {
     }
 }
 
+# YATUBE_DB_PROFILE=production turns on WAL and the other pragmas of
+# posts.sqlite.PROFILES and keeps each worker's connection open across
+# requests. Run the benchmark_sqlite command to compare the profiles.
+POSTS_SQLITE_PROFILE = os.environ.get("YATUBE_DB_PROFILE", "development")
+if POSTS_SQLITE_PROFILE == "production":
+    DATABASES["default"]["CONN_MAX_AGE"] = int(
+        os.environ.get("YATUBE_CONN_MAX_AGE", 600)
+    )
+
+# Read replicas: YATUBE_REPLICAS lists SQLite files kept up to date with
+# "refresh_replicas --interval 30". Feed and post pages read from them;
+# sessions that wrote something stay on the primary for the pin time,
+# which has to be longer than the refresh interval.
+DATABASE_ROUTERS = ["posts.replicas.ReplicaRouter"]
+POSTS_REPLICAS = []
+POSTS_REPLICA_PIN_SECONDS = 60
+# How far behind the primary a replica can be: the refresh interval.
+# Fragments and pages rendered from a replica are cached no longer.
+POSTS_REPLICA_LAG = 30
+REPLICA_PATHS = os.environ.get("YATUBE_REPLICAS", "")
+for number, path in enumerate(filter(None, REPLICA_PATHS.split(",")), 1):
+    alias = f"replica{number}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "NAME": path,
+        "TEST": {"MIRROR": "default"},
+    }
+    POSTS_REPLICAS.append(alias)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -139,4 +188,54 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 
 SITE_ID = 1
 
-CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache",}}
+# Locmem cache that reports hits and misses to posts.metrics, like the
+# template backend above reports render time.
+CACHES = {"default": {"BACKEND": "posts.backends.InstrumentedLocMemCache",}}
+
+# With several worker processes, point YATUBE_CACHE_DIR at a directory
+# they all share: each worker then keeps a small LRU in front of a cache
+# on disk, so invalidations and recomputed fragments reach every worker.
+CACHE_DIR = os.environ.get("YATUBE_CACHE_DIR")
+if CACHE_DIR:
+    CACHES = {
+        "default": {
+            "BACKEND": "posts.backends.TieredCache",
+            "OPTIONS": {
+                "SHARED": "shared",
+                "SHARED_ONLY": ["posts:generation:"],
+                "LOCAL_TIMEOUT": 5,
+                "LOCAL_MAX_ENTRIES": 1000,
+            },
+        },
+        "shared": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": CACHE_DIR,
+            "OPTIONS": {"MAX_ENTRIES": 20000},
+        },
+    }
+
+# Feeds: "pages" for numbered pages, "cursor" for keyset pagination
+# on (pub_date, id). A request with ?after=/?before= always uses cursors.
+POSTS_PAGINATION = "pages"
+
+# Feed fragments are invalidated through generation counters on writes,
+# so they can live long.
+POSTS_FEED_CACHE_TIMEOUT = 60 * 60
+
+# Whole pages served to logged-out readers, invalidated the same way.
+POSTS_PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Rendered post cards, keyed by the post's version, so they need no
+# invalidation and only expire to free room.
+POSTS_CARD_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Threads the thumbnail_worker command resizes uploaded images with.
+POSTS_THUMBNAIL_WORKERS = 2
+
+# Uploads are normalized by the thumbnail worker in this many processes:
+# EXIF orientation applied, the longer side capped and re-encoded.
+POSTS_IMAGE_PROCESSES = 2
+POSTS_IMAGE_MAX_SIDE = 2048
+POSTS_IMAGE_FORMAT = "WEBP"
+POSTS_IMAGE_QUALITY = 82
+POSTS_MAX_UPLOAD_SIZE = 20 * 1024 * 1024